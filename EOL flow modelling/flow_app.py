@@ -1,7 +1,28 @@
 
+import os
+import sys
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+
+# Interviews and flows are stored through the backend models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.core.flow_graph import FlowGraph, sync_flow_graph
+from backend.core.models import Interview, MaterialFlow
+from backend.core.batch import ReferenceTables
+from backend.core.calculator import EmissionsCalculator
+from backend.core.reference_data import REFERENCE_CACHE_TTL_SECONDS, reference_cache
+from backend.core.transport import (TRANSPORT_MODES, TransportMode, encode_flows, flow_scenarios,
+                                    flow_transport_table, load_gazetteer, transport_emissions, transport_modes)
+from backend.core.risk_scoring import SCORE_INPUTS, RiskIndex, RiskWeights, sync_risk_index
+from backend.db.connection import SessionLocal, engine
+from backend.db import flow_store
+from backend.db.flow_import import import_file
+from backend.db.flow_rollups import rebuild_rollups, rollup
+from backend.db.flow_records import (FILTER_COLUMNS, MODELS, add_record, count_records, create_flow_tables,
+                                     distinct_values, import_csv, page_count, query_records, table_version,
+                                     transport_inputs)
 
 # Set up file paths
 interview_file = "interviews.csv"
@@ -9,27 +30,294 @@ flow_file = "material_flows.csv"
 collection_file = "collection_methods.csv"
 categories_file = "stakeholder_categories.csv"
 
+@st.cache_resource
+def prepare_database():
+    """Create the tables once per server and move records from the old CSV files over."""
+    create_flow_tables(engine)
+    with SessionLocal() as session:
+        for model, path in ((Interview, interview_file), (MaterialFlow, flow_file)):
+            if os.path.exists(path) and count_records(session, model) == 0:
+                import_csv(session, model, path)
+        # Flows saved before the rollup table existed
+        if count_records(session, MaterialFlow) and rollup(session, "month").empty:
+            rebuild_rollups(session)
+
+@st.cache_data
+def _read_lookup(path, mtime_ns, key_column):
+    data = pd.read_csv(path)
+    return data[key_column].tolist(), dict(zip(data[key_column], data["Description"]))
+
+def load_lookup(path, key_column):
+    """Options and option -> description of a lookup CSV; re-read only after the file changes."""
+    return _read_lookup(path, os.stat(path).st_mtime_ns, key_column)
+
+@st.cache_resource
+def flow_graph():
+    """One flow graph per server; each sync only adds the flows saved since the previous one."""
+    return FlowGraph()
+
+@st.cache_resource(max_entries=1)
+def synced_flow_graph(flows_version):
+    """The flow graph with every saved flow; the sync only runs again after flows were saved."""
+    graph = flow_graph()
+    with SessionLocal() as session:
+        sync_flow_graph(session, graph)
+    return graph
+
+def current_flow_graph():
+    with SessionLocal() as session:
+        return synced_flow_graph(table_version(session, MaterialFlow))
+
+@st.cache_resource(max_entries=8)
+def risk_index(weights):
+    """Scores for one weighting, kept per server; each sync only scores the new interviews."""
+    return RiskIndex(weights)
+
+@st.cache_resource(max_entries=8)
+def synced_risk_index(weights, interviews_version):
+    """The index for `weights` with every saved interview; synced again only after interviews were saved."""
+    index = risk_index(weights)
+    with SessionLocal() as session:
+        sync_risk_index(session, index)
+    return index
+
+def show_risk_ranking():
+    defaults = RiskWeights()
+    with st.expander("Score weights"):
+        columns = st.columns(2)
+        weights = RiskWeights(**{
+            name: columns[i % 2].slider(name.replace("_", " ").capitalize(), 0.0, 3.0, getattr(defaults, name), 0.5,
+                                        key=f"weight_{name}")
+            for i, name in enumerate(SCORE_INPUTS)
+        })
+    try:
+        weights.vector()
+    except ValueError as error:
+        st.error(str(error))
+        return
+    with SessionLocal() as session:
+        index = synced_risk_index(weights, table_version(session, Interview))
+    if not len(index):
+        st.info("No interviews saved yet.")
+        return
+    role_col, location_col, k_col = st.columns(3)
+    role = role_col.selectbox("Stakeholder Category", ["All"] + index.groups("role"), key="rank_role")
+    location = location_col.selectbox("Location", ["All"] + index.groups("location"), key="rank_location")
+    k = k_col.number_input("Show top", min_value=1, max_value=1000, value=10, key="rank_k")
+    lowest = st.toggle("Lowest risk first", key="rank_lowest")
+    ranked = index.top(int(k), None if role == "All" else role, None if location == "All" else location, lowest)
+    st.dataframe(ranked.rename(columns={"score": "Risk score (0-100)"}), hide_index=True)
+
+@st.cache_resource(max_entries=2)
+def encoded_transport_flows(flows_version, gazetteer):
+    """Flows with resolved locations and modes; re-encoded only when flows or the gazetteer change."""
+    with SessionLocal() as session:
+        data = transport_inputs(session)
+    return data, encode_flows(data, *gazetteer)
+
+def show_transport_emissions():
+    with SessionLocal() as session:
+        flows_version = table_version(session, MaterialFlow)
+    if not flows_version[0]:
+        st.info("No material flows saved yet.")
+        return
+    data, flows = encoded_transport_flows(flows_version, load_gazetteer())
+    with st.expander("Emission factors per transport mode"):
+        factors = st.data_editor(pd.DataFrame(
+            [(mode, factor.kg_co2e_per_tonne_km, factor.circuity) for mode, factor in TRANSPORT_MODES.items()],
+            columns=["Mode", "kg CO2e per tonne-km", "Circuity"]
+        ), hide_index=True, disabled=["Mode"], key="transport_factors", column_config={
+            "kg CO2e per tonne-km": st.column_config.NumberColumn(required=True, min_value=0.0, format="%.3f"),
+            "Circuity": st.column_config.NumberColumn(required=True, min_value=1.0, format="%.2f")
+        })
+    modes, reset = transport_modes({row["Mode"]: (row["kg CO2e per tonne-km"], row["Circuity"])
+                                    for row in factors.to_dict("records")})
+    if reset:
+        st.warning("Using the default factors for " + ", ".join(reset)
+                   + " (the factor must be a number of at least 0, the circuity at least 1).")
+    # Only the factors changed between reruns, so this is a single array expression
+    emissions = transport_emissions(flows, modes)
+    table = flow_transport_table(data, flows, emissions)
+    resolved = table[table["status"] == "ok"]
+    st.metric("Transport emissions (kg CO2e/month)", f"{resolved['transport_kg_co2e_month'].sum():,.1f}")
+    unresolved = table["status"].value_counts().drop("ok", errors="ignore")
+    if not unresolved.empty:
+        st.caption("Not calculated: " + ", ".join(f"{count} flows with {status}" for status, count in unresolved.items())
+                   + " (locations must be in gazetteer.csv, modes one of " + ", ".join(TRANSPORT_MODES) + ").")
+    st.dataframe(resolved.sort_values("transport_kg_co2e_month", ascending=False).head(100), hide_index=True)
+    show_processing_footprint(data, emissions)
+
+@st.cache_resource(max_entries=2, ttl=REFERENCE_CACHE_TTL_SECONDS)
+def reference_tables(reference_version):
+    """Materials, processes and grid mixes as arrays; reloaded after reference writes or the cache TTL."""
+    with SessionLocal() as session:
+        return ReferenceTables.from_session(session)
+
+def show_processing_footprint(data, emissions):
+    """Emissions of processing each material's flows, including their transport."""
+    st.markdown("**Processing footprint per material (kg CO2e/month)**")
+    try:
+        tables = reference_tables(reference_cache.version)
+    except SQLAlchemyError:
+        tables = None
+    with SessionLocal() as session:
+        if tables is None or not tables.process_names or not tables.grid_mix_names:
+            st.info("Seed the materials, processes and grid mixes (backend/db/seed_data.py) to see this.")
+            return
+        process_col, grid_col = st.columns(2)
+        process = process_col.selectbox("Process", sorted(set(tables.process_names)), key="footprint_process")
+        grid_mix = grid_col.selectbox("Grid mix", sorted(set(tables.grid_mix_names)), key="footprint_grid_mix")
+        scenarios, unmatched = flow_scenarios(data, emissions, tables.material_names, process, grid_mix)
+        results = EmissionsCalculator(session).compare_scenarios(scenarios) if scenarios else []
+    if unmatched:
+        st.caption("Material types not in the materials table: " + ", ".join(unmatched))
+    st.dataframe(pd.DataFrame([
+        {"Material": scenario.material_name, "kg/month": scenario.mass_kg,
+         "Material production": result["breakdown"]["material_production_emissions"],
+         "Processing": result["breakdown"]["process_emissions"],
+         "Transport": result["breakdown"]["transport_emissions"],
+         "Total": result["total_emissions_kg_co2e"]}
+        for scenario, result in zip(scenarios, results)
+    ]), hide_index=True)
+
+def show_flow_network():
+    graph = current_flow_graph()
+    if not graph.edge_total:
+        st.info("No flows with a destination or processor yet.")
+        return
+    material_col, edges_col = st.columns(2)
+    material = material_col.selectbox("Material", ["All"] + graph.materials(), key="sankey_material")
+    max_edges = edges_col.slider("Largest flows shown", 10, 500, 100, key="sankey_edges")
+    sankey = graph.sankey(None if material == "All" else material, max_edges=max_edges)
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        st.info("Install plotly to see the Sankey diagram; showing the flows as a table instead.")
+        st.dataframe(pd.DataFrame({
+            "From": [sankey["labels"][i] for i in sankey["source"]],
+            "To": [sankey["labels"][i] for i in sankey["target"]],
+            "Volume (kg/month)": sankey["value"]
+        }), hide_index=True)
+    else:
+        st.plotly_chart(go.Figure(go.Sankey(
+            node=dict(label=sankey["labels"], pad=15),
+            link=dict(source=sankey["source"], target=sankey["target"], value=sankey["value"])
+        )), use_container_width=True)
+
+    throughput = graph.throughput()
+    if throughput:
+        st.write("Throughput per processor (kg/month)")
+        st.dataframe(pd.DataFrame(sorted(throughput.items(), key=lambda item: -item[1]),
+                                  columns=["Processor", "Volume (kg/month)"]), hide_index=True)
+    node = st.selectbox("Trace an organization", graph.nodes, key="trace_node")
+    upstream_col, downstream_col = st.columns(2)
+    upstream_col.write("Upstream: " + (", ".join(sorted(graph.upstream(node))) or "none"))
+    downstream_col.write("Downstream: " + (", ".join(sorted(graph.downstream(node))) or "none"))
+
+@st.cache_resource(max_entries=1)
+def synced_store(versions):
+    """Append the database rows saved since the last sync to the columnar store, once per change."""
+    with SessionLocal() as session:
+        return flow_store.sync_store(session)
+
+def show_analytics():
+    """Charts over the columnar store; only the columns and months a chart needs are read."""
+    with SessionLocal() as session:
+        synced_store(tuple(table_version(session, model) for model in MODELS.values()))
+    start_col, end_col = st.columns(2)
+    start = start_col.date_input("From", value=None, key="analytics_start")
+    end = end_col.date_input("To", value=None, key="analytics_end")
+
+    st.write("Risk score distribution (number of interviews per score)")
+    st.bar_chart(flow_store.risk_distribution(start, end))
+    volume_col, chain_col = st.columns(2)
+    with volume_col:
+        st.write("Material flow volume by collection method (kg/month)")
+        if start is None and end is None:
+            with SessionLocal() as session:
+                st.bar_chart(rollup(session, "collection_method")["volume_kg_month"])
+        else:
+            st.bar_chart(flow_store.volume_by_collection_method("material_flows", start, end))
+    with chain_col:
+        st.write("Interviews by value chain type")
+        st.bar_chart(flow_store.value_chain_type_counts(start, end))
+
+def show_flow_totals():
+    """Volume summaries from the rollup table, which is updated on every save."""
+    dimensions = {"material_type": "Material Type", "source_location": "Source Location",
+                  "collection_method": "Collection Method", "month": "Month"}
+    dimension = st.radio("Total kg/month per", list(dimensions), format_func=dimensions.get,
+                         horizontal=True, key="rollup_dimension")
+    with SessionLocal() as session:
+        totals = rollup(session, dimension)
+    if totals.empty:
+        st.info("No material flows saved yet.")
+        return
+    st.bar_chart(totals["volume_kg_month"])
+    st.dataframe(totals.rename(columns={"volume_kg_month": "Volume (kg/month)", "flow_count": "Flows"}))
+
+def bulk_import(table, key):
+    """Uploader for a CSV/XLSX file of records; shows the rejected rows with their reasons."""
+    with st.expander("Bulk import from CSV/XLSX"):
+        st.caption("Column names must match the table columns, e.g. " + ", ".join(FILTER_COLUMNS[MODELS[table]]) + ".")
+        upload = st.file_uploader("File", type=["csv", "xlsx"], key=f"{key}_upload")
+        if upload is None or not st.button("Import", key=f"{key}_import"):
+            return
+        try:
+            with SessionLocal() as session:
+                report = import_file(session, table, upload, filename=upload.name)
+        except ValueError as error:
+            st.error(str(error))
+            return
+        st.success(f"Imported {report.imported} rows.")
+        if report.rejected:
+            st.warning(f"Rejected {report.rejected} rows (spreadsheet row numbers, header = row 1; "
+                       f"the first {len(report.errors)} are listed).")
+            st.dataframe(report.errors, hide_index=True)
+            st.download_button("Download error report", report.errors.to_csv(index=False),
+                               file_name=f"{table}_import_errors.csv", key=f"{key}_errors")
+
+def show_records(model, key, labels, empty_message):
+    """Filter and page through records in the database; only the visible page is loaded."""
+    with SessionLocal() as session:
+        filters = {}
+        for column, container in zip(FILTER_COLUMNS[model], st.columns(len(FILTER_COLUMNS[model]))):
+            options = ["All"] + distinct_values(session, model, column)
+            choice = container.selectbox(labels[column], options, key=f"{key}_{column}")
+            filters[column] = None if choice == "All" else choice
+
+        total = count_records(session, model, filters)
+        if total == 0:
+            st.info(empty_message)
+            return
+        size_col, page_col = st.columns(2)
+        page_size = size_col.selectbox("Rows per page", [25, 50, 100, 250], index=1, key=f"{key}_page_size")
+        pages = page_count(total, page_size)
+        page = page_col.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+        st.dataframe(query_records(session, model, filters, page, page_size), hide_index=True)
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first}-{min(first + page_size - 1, total)} of {total}")
+
+prepare_database()
+
 st.title("TPC Recycling: Stakeholder & Material Flow Tracker")
 
 # Tabs for Interview and Material Flow
-tab1, tab2 = st.tabs(["📋 Stakeholder Interviews", "🔁 Material Flows"])
+tab1, tab2, tab3 = st.tabs(["📋 Stakeholder Interviews", "🔁 Material Flows", "📊 Analytics"])
 
 with tab1:
     st.header("New Stakeholder Interview")
     with st.form("interview_form"):
         name = st.text_input("Name")
-        category_df = pd.read_csv(categories_file)
-        category_options = category_df["Category Name"].tolist()
+        category_options, _ = load_lookup(categories_file, "Category Name")
         role = st.selectbox("Stakeholder Category", category_options)
         org = st.text_input("Organization")
         location = st.text_input("Location")
         material_types = st.text_input("Material Types (e.g., TPC panels, structural)")
-        collection_df = pd.read_csv(collection_file)
-        collection_options = collection_df["Collection Method"].tolist()
+        collection_options, method_descriptions = load_lookup(collection_file, "Collection Method")
         collection_method = st.selectbox("Collection Method", collection_options)
-        if collection_method != "Other":
-            method_description = collection_df[collection_df["Collection Method"] == collection_method]["Description"].iloc[0]
-            st.info(f"📝 {method_description}")
+        if collection_method != "Other" and collection_method in method_descriptions:
+            st.info(f"📝 {method_descriptions[collection_method]}")
         volume = st.number_input("Estimated Volume (kg/month)", min_value=0)
         transportation = st.text_input("Transportation Mode")
         processing_tech = st.text_input("Processing Technology (if any)")
@@ -60,34 +348,33 @@ with tab1:
         submitted = st.form_submit_button("Save Interview")
 
         if submitted:
-            new_entry = pd.DataFrame([{
-                "timestamp": datetime.now(),
-                "name": name, "role": role, "org": org, "location": location,
-                "material_types": material_types, "collection_method": collection_method,
-                "volume": volume, "transportation": transportation,
-                "processing_tech": processing_tech, "current_eol": current_eol,
-                "missing_eol": missing_eol, "value_chain_exp": value_chain_exp,
-                "risk_financial": risk_financial, "risk_technical": risk_technical,
-                "risk_operational": risk_operational, "risk_regulatory": risk_regulatory,
-                "risk_market": risk_market, "risk_environmental": risk_environmental,
-                "value_chain_type": value_chain_type, "responsibility": responsibility,
-                "proximity": proximity, "material_trace": material_trace,
-                "risks": risks, "interest": interest
-            }])
-            try:
-                old_data = pd.read_csv(interview_file)
-                updated = pd.concat([old_data, new_entry], ignore_index=True)
-            except FileNotFoundError:
-                updated = new_entry
-            updated.to_csv(interview_file, index=False)
+            with SessionLocal() as session:
+                add_record(session, Interview, {
+                    "timestamp": datetime.now(),
+                    "name": name, "role": role, "org": org, "location": location,
+                    "material_types": material_types, "collection_method": collection_method,
+                    "volume": volume, "transportation": transportation,
+                    "processing_tech": processing_tech, "current_eol": current_eol,
+                    "missing_eol": missing_eol, "value_chain_exp": value_chain_exp,
+                    "risk_financial": risk_financial, "risk_technical": risk_technical,
+                    "risk_operational": risk_operational, "risk_regulatory": risk_regulatory,
+                    "risk_market": risk_market, "risk_environmental": risk_environmental,
+                    "value_chain_type": value_chain_type, "responsibility": responsibility,
+                    "proximity": proximity, "material_trace": material_trace,
+                    "risks": risks, "interest": interest
+                })
             st.success("Interview saved!")
 
+    bulk_import("interviews", "interviews")
+
+    st.subheader("Stakeholder Risk Ranking")
+    show_risk_ranking()
+
     st.subheader("Saved Interviews")
-    try:
-        interview_data = pd.read_csv(interview_file)
-        st.dataframe(interview_data)
-    except FileNotFoundError:
-        st.info("No interviews saved yet.")
+    show_records(Interview, "interviews", {
+        "org": "Organization", "location": "Location",
+        "material_types": "Material Types", "collection_method": "Collection Method"
+    }, "No interviews saved yet.")
 
 with tab2:
     st.header("New Material Flow Entry")
@@ -105,25 +392,34 @@ with tab2:
         submitted_flow = st.form_submit_button("Save Flow")
 
         if submitted_flow:
-            new_flow = pd.DataFrame([{
-                "timestamp": datetime.now(),
-                "source_org": source_org, "source_type": source_type,
-                "material_type": material_type, "volume_kg_month": volume_flow,
-                "source_location": source_location, "collection_method": collection,
-                "transport_mode": transport, "destination": destination,
-                "processor": processor, "notes": notes
-            }])
-            try:
-                old_flows = pd.read_csv(flow_file)
-                updated_flows = pd.concat([old_flows, new_flow], ignore_index=True)
-            except FileNotFoundError:
-                updated_flows = new_flow
-            updated_flows.to_csv(flow_file, index=False)
+            with SessionLocal() as session:
+                add_record(session, MaterialFlow, {
+                    "timestamp": datetime.now(),
+                    "source_org": source_org, "source_type": source_type,
+                    "material_type": material_type, "volume_kg_month": volume_flow,
+                    "source_location": source_location, "collection_method": collection,
+                    "transport_mode": transport, "destination": destination,
+                    "processor": processor, "notes": notes
+                })
             st.success("Material flow saved!")
 
+    bulk_import("material_flows", "flows")
+
     st.subheader("Mapped Material Flows")
-    try:
-        flow_data = pd.read_csv(flow_file)
-        st.dataframe(flow_data)
-    except FileNotFoundError:
-        st.info("No material flows saved yet.")
+    show_records(MaterialFlow, "flows", {
+        "source_org": "Source Organization", "source_location": "Source Location",
+        "material_type": "Material Type", "collection_method": "Collection Method"
+    }, "No material flows saved yet.")
+
+    st.subheader("Flow Totals")
+    show_flow_totals()
+
+    st.subheader("Transport Emissions")
+    show_transport_emissions()
+
+    st.subheader("Flow Network")
+    show_flow_network()
+
+with tab3:
+    st.header("Interview and Flow Analytics")
+    show_analytics()
@@ -0,0 +1,56 @@
+"""Regenerate every figure of the analysis into results/plots.
+
+Usage:
+    python -m analysis.plots                # all figures, one worker per core
+    python -m analysis.plots --workers 1    # render in this process
+    python -m analysis.plots --only pa6_comparison energy_consumption
+    python -m analysis.plots --force        # ignore the manifest and re-render everything
+
+Figures whose data, plotting code and style are unchanged since the last run are
+skipped using the manifest in results/plots.
+"""
+
+import argparse
+import sys
+import time
+
+from .scenarios import recycling, sensitivity
+from .scenarios.materials import use_database_materials
+from .utils.jobs import print_job_report, run_plot_jobs
+from .visualizations import emissions_plots
+
+def all_jobs():
+    """Plot jobs of every analysis module, in rendering order."""
+    return (
+        recycling.figure_jobs(recycling.default_scenarios())
+        + emissions_plots.figure_jobs()
+        + sensitivity.figure_jobs()
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the analysis figures in parallel.')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: all cores)')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='render only these jobs')
+    parser.add_argument('--force', action='store_true', help='re-render figures even if they are up to date')
+    parser.add_argument('--list', action='store_true', help='list the job names and exit')
+    args = parser.parse_args(argv)
+
+    use_database_materials()
+    jobs = all_jobs()
+    if args.list:
+        for job in jobs:
+            print(job.name)
+        return 0
+    if args.only:
+        unknown = set(args.only) - {job.name for job in jobs}
+        if unknown:
+            parser.error(f'unknown jobs: {", ".join(sorted(unknown))}')
+        jobs = [job for job in jobs if job.name in args.only]
+
+    start = time.perf_counter()
+    results = run_plot_jobs(jobs, max_workers=args.workers, force=args.force)
+    print_job_report(results, time.perf_counter() - start)
+    return 1 if any(result.error for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Array-based multi-cycle recycling cascade simulator.
+
+Cycle 0 is the initial production of 1 kg of product. In every later cycle the recovered
+material (`cycle_yield` of the previous product) is reprocessed and topped up with virgin
+material: the recycled share is `cycle_yield * (1 - virgin_top_up)`, the rest is virgin.
+Each reprocessing lowers the quality of the recycled fraction by `degradation`, so the blend
+quality follows Q_k = recycled_share * (1 - degradation) * Q_{k-1} + virgin_share with
+Q_0 = 1, and cycle emissions are reported per quality-adjusted kg (emissions / Q_k).
+
+With the defaults (full yield, no top-up, no degradation) this reduces to the original
+model: every later cycle only costs the reprocessing emissions.
+
+All inputs broadcast against each other, so arrays of scenarios are simulated at once;
+the cycle axis is always the last axis of the results.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+@dataclass
+class CascadeResult:
+    """Per-cycle results with the cycle axis last; index 0 is the initial production."""
+    cycle_emissions: np.ndarray
+    cumulative_emissions: np.ndarray
+    average_emissions: np.ndarray
+    virgin_share: np.ndarray
+    quality: np.ndarray
+
+    def upto(self, n_cycles: int) -> "CascadeResult":
+        """Results for a shorter cascade (the first `n_cycles` cycles)."""
+        return CascadeResult(*(values[..., :n_cycles] for values in (
+            self.cycle_emissions, self.cumulative_emissions, self.average_emissions,
+            self.virgin_share, self.quality
+        )))
+
+def simulate_cascade(initial_emissions, recycling_emissions_per_kg, virgin_co2_per_kg, n_cycles=10,
+                     cycle_yield=1.0, virgin_top_up=0.0, degradation=0.0) -> CascadeResult:
+    """Simulate `n_cycles` cycles (including the initial production) for every input combination."""
+    initial_emissions = np.asarray(initial_emissions, dtype=float)[..., np.newaxis]
+    recycling_emissions_per_kg = np.asarray(recycling_emissions_per_kg, dtype=float)[..., np.newaxis]
+    virgin_co2_per_kg = np.asarray(virgin_co2_per_kg, dtype=float)[..., np.newaxis]
+    cycle_yield = np.asarray(cycle_yield, dtype=float)[..., np.newaxis]
+    virgin_top_up = np.asarray(virgin_top_up, dtype=float)[..., np.newaxis]
+    degradation = np.asarray(degradation, dtype=float)[..., np.newaxis]
+
+    recycled_share = np.clip(cycle_yield * (1 - virgin_top_up), 0.0, 1.0)
+    virgin_share = 1.0 - recycled_share
+
+    # Closed form of the quality recurrence: Q_k = a^k + b * (1 - a^k) / (1 - a)
+    cycles = np.arange(n_cycles)
+    a = recycled_share * (1 - degradation)
+    a_pow = np.power(a, cycles)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(a == 1, cycles, (1 - a_pow) / (1 - a))
+    quality = a_pow + virgin_share * growth
+
+    later = recycling_emissions_per_kg + virgin_share * virgin_co2_per_kg
+    cycle_emissions = np.where(cycles == 0, initial_emissions, later) / quality
+    shape = cycle_emissions.shape
+
+    cumulative_emissions = np.cumsum(cycle_emissions, axis=-1)
+    average_emissions = cumulative_emissions / np.arange(1, n_cycles + 1)
+    return CascadeResult(
+        cycle_emissions=cycle_emissions,
+        cumulative_emissions=cumulative_emissions,
+        average_emissions=average_emissions,
+        virgin_share=np.broadcast_to(np.where(cycles == 0, 1.0, virgin_share), shape),
+        quality=np.broadcast_to(quality, shape)
+    )
+
+def scenario_cascade(initial_scenario, recycling_scenario, material_type='PEEK', initial_scrap_percentage=70,
+                     n_cycles=10, cycle_yield=1.0, virgin_top_up=0.0, degradation=0.0) -> CascadeResult:
+    """Cascade where the first cycle runs `initial_scenario` and later cycles `recycling_scenario`.
+
+    Either argument may also be a sequence of scenarios; the scenario axis comes first.
+    """
+    def emissions(scenarios, scrap, key):
+        if isinstance(scenarios, (list, tuple)):
+            return np.array([s.calculate_emissions_with_material(1.0, scrap, material_type)[key] for s in scenarios])
+        return scenarios.calculate_emissions_with_material(1.0, scrap, material_type)[key]
+
+    return simulate_cascade(
+        initial_emissions=emissions(initial_scenario, initial_scrap_percentage, 'total_emissions'),
+        recycling_emissions_per_kg=emissions(recycling_scenario, 100, 'total_emissions'),
+        virgin_co2_per_kg=emissions(recycling_scenario, 0, 'material_emissions'),
+        n_cycles=n_cycles,
+        cycle_yield=cycle_yield,
+        virgin_top_up=virgin_top_up,
+        degradation=degradation
+    )
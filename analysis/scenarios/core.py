@@ -0,0 +1,154 @@
+"""Recycling scenario calculations, importable without matplotlib or scipy.
+
+Only NumPy is needed here, so API and batch workers can use `RecyclingScenario` without
+paying for the plotting stack; recycling.py re-exports everything for the analysis scripts.
+"""
+
+import numpy as np
+
+from .materials import default_registry
+
+class RecyclingScenario:
+    def __init__(self, name, granulator_energy_mj, pelletizing_energy_mj, de_grid_co2_per_mj=0.161, materials=None):
+        self.name = name
+        self.granulator_energy_mj = granulator_energy_mj
+        self.pelletizing_energy_mj = pelletizing_energy_mj
+        self.de_grid_co2_per_mj = de_grid_co2_per_mj
+        # Virgin material factors come from the material registry (see materials.py)
+        self.materials = materials or default_registry()
+        # Per-scenario replacements keyed by material code, e.g. Monte Carlo draws
+        self.material_overrides = {}
+
+    def calculate_emissions_with_material(self, final_weight_kg, scrap_percentage=100, material_type='PA6'):
+        """Calculate emissions for given weight and scrap percentage with specified material."""
+        # Calculate total energy
+        total_energy_mj = (self.granulator_energy_mj + self.pelletizing_energy_mj) * final_weight_kg
+        
+        # Calculate emissions from energy
+        energy_emissions = total_energy_mj * self.de_grid_co2_per_mj
+        
+        # Calculate material emissions based on material type
+        material_co2_per_kg = self.material_co2_per_kg(material_type)
+        
+        material_emissions = (100 - scrap_percentage) / 100 * material_co2_per_kg * final_weight_kg
+        
+        return {
+            'total_energy_mj': total_energy_mj,
+            'energy_emissions': energy_emissions,
+            'material_emissions': material_emissions,
+            'total_emissions': energy_emissions + material_emissions
+        }
+
+    def material_co2_per_kg(self, material_type):
+        """Virgin material factor (kg CO2 per kg) of a single material type."""
+        code = self.materials.code(material_type)
+        if code in self.material_overrides:
+            return self.material_overrides[code]
+        return float(self.materials.production_emissions[code])
+
+    def material_factors(self):
+        """Virgin material factors (kg CO2 per kg) indexed by registry code."""
+        factors = self.materials.production_emissions
+        if self.material_overrides:
+            factors = factors.copy()
+            for code, value in self.material_overrides.items():
+                factors[code] = value
+        return factors
+
+    def material_codes(self, material_types):
+        """Map material names (or integer codes) to registry codes."""
+        return self.materials.codes(material_types)
+
+    def calculate_emissions_grid(self, final_weights_kg, scrap_percentages, material_types):
+        """Calculate emissions for every weight x scrap percentage x material combination.
+
+        Inputs are 1-D sequences (material types as names or registry codes); every result is
+        an array of shape (len(final_weights_kg), len(scrap_percentages), len(material_types)).
+        """
+        weights = np.atleast_1d(np.asarray(final_weights_kg, dtype=float))[:, np.newaxis, np.newaxis]
+        scraps = np.atleast_1d(np.asarray(scrap_percentages, dtype=float))[np.newaxis, :, np.newaxis]
+        codes = np.atleast_1d(self.material_codes(material_types))
+        material_co2_per_kg = self.material_factors()[codes][np.newaxis, np.newaxis, :]
+        shape = (weights.shape[0], scraps.shape[1], material_co2_per_kg.shape[2])
+
+        total_energy_mj = (self.granulator_energy_mj + self.pelletizing_energy_mj) * weights
+        energy_emissions = total_energy_mj * self.de_grid_co2_per_mj
+        material_emissions = (100 - scraps) / 100 * material_co2_per_kg * weights
+
+        return {
+            'total_energy_mj': np.broadcast_to(total_energy_mj, shape),
+            'energy_emissions': np.broadcast_to(energy_emissions, shape),
+            'material_emissions': material_emissions,
+            'total_emissions': energy_emissions + material_emissions
+        }
+
+    def calculate_emissions(self, final_weight_kg, scrap_percentage=100):
+        """Calculate emissions for given weight and scrap percentage."""
+        # Calculate total energy
+        total_energy_mj = self.granulator_energy_mj + self.pelletizing_energy_mj
+        
+        # Calculate emissions from energy
+        energy_emissions = total_energy_mj * self.de_grid_co2_per_mj
+        
+        # Calculate material emissions (if using virgin PA6)
+        virgin_pa6_percentage = (100 - scrap_percentage) / 100
+        material_emissions = virgin_pa6_percentage * self.material_co2_per_kg('PA6')
+        
+        # Total emissions per kg
+        total_emissions_per_kg = energy_emissions + material_emissions
+        
+        # Scale to final weight
+        total_emissions = total_emissions_per_kg * final_weight_kg
+        
+        return {
+            'total_energy_mj': total_energy_mj * final_weight_kg,
+            'energy_emissions': energy_emissions * final_weight_kg,
+            'material_emissions': material_emissions * final_weight_kg,
+            'total_emissions': total_emissions
+        }
+
+def spiral_scenario():
+    """Spiral grinding + Sphera pelletization, used for the later cycles of the cascade plots."""
+    return RecyclingScenario(
+        "Spiral Grinding + Sphera Pelletization",
+        granulator_energy_mj=0.05,  # Spiral grinding energy
+        pelletizing_energy_mj=1.1    # Sphera pelletization energy
+    )
+
+def emissions_table(scenarios, scrap_percentages, material_types, final_weight_kg=1.0):
+    """Total emissions of every scenario for each scrap x material combination, shape (S, P, M)."""
+    return np.array([
+        s.calculate_emissions_grid([final_weight_kg], scrap_percentages, material_types)['total_emissions'][0]
+        for s in scenarios
+    ])
+
+def default_scenarios():
+    """The five processing routes compared throughout the analysis."""
+    # Shorter names for better plot readability
+    return [
+        RecyclingScenario(
+            "Aggregated Process\n(Sphera)",
+            granulator_energy_mj=2.65,
+            pelletizing_energy_mj=0.0
+        ),
+        RecyclingScenario(
+            "Separate Processes\n(Sphera)",
+            granulator_energy_mj=0.33,
+            pelletizing_energy_mj=1.1
+        ),
+        RecyclingScenario(
+            "Hybrid Process\n(Spiral + Sphera)",
+            granulator_energy_mj=0.05,
+            pelletizing_energy_mj=1.1
+        ),
+        RecyclingScenario(
+            "Alternative Process\n(Sphera + PIE)",
+            granulator_energy_mj=0.33,
+            pelletizing_energy_mj=2.2716
+        ),
+        RecyclingScenario(
+            "Incineration",
+            granulator_energy_mj=2.9/0.0581,  # Convert CO2 emissions back to energy using grid factor
+            pelletizing_energy_mj=0.0
+        )
+    ]
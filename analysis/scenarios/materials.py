@@ -0,0 +1,122 @@
+"""Material factor registry backed by the `materials` table.
+
+All materials are held in one float array indexed by an integer code, so hot loops work
+on code arrays instead of comparing strings. Materials are addressable by their full
+name and by the abbreviation in parentheses, e.g. 'Polypropylene (PP)' and 'PP'.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+# Used when no database registry has been loaded
+DEFAULT_MATERIALS = [
+    ('PA6', 4.45),    # kg CO2 per kg material
+    ('PEEK', 13.70),  # kg CO2 per kg material
+    ('PPS', 2.13)     # kg CO2 per kg material (estimated)
+]
+
+_ABBREVIATION = re.compile(r'\(([^()]+)\)\s*$')
+
+class MaterialRegistry:
+    """Index-addressable virgin material factors (kg CO2e per kg)."""
+
+    def __init__(self, names: Sequence[str], production_emissions: Sequence[float],
+                 aliases: Optional[Dict[str, str]] = None):
+        self.names = list(names)
+        self.production_emissions = np.asarray(production_emissions, dtype=float)
+        self._index = {}
+        for code, name in enumerate(self.names):
+            self._index.setdefault(name, code)
+            match = _ABBREVIATION.search(name)
+            if match:
+                self._index.setdefault(match.group(1).strip(), code)
+        for alias, name in (aliases or {}).items():
+            self._index[alias] = self._index[name]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "MaterialRegistry":
+        """Build from Material rows (anything with `name` and `production_emissions`)."""
+        rows = [row for row in rows if row.production_emissions is not None]
+        return cls([row.name for row in rows], [row.production_emissions for row in rows])
+
+    @classmethod
+    def from_session(cls, session) -> "MaterialRegistry":
+        """Load every Material row with a single query."""
+        from backend.core.models import Material
+        return cls.from_rows(session.query(Material).order_by(Material.id).all())
+
+    def code(self, name: str) -> int:
+        """Integer code of a material name or abbreviation."""
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(f'Unknown material type: {name}')
+
+    def codes(self, names) -> np.ndarray:
+        """Integer codes for an array of names; integer input is passed through."""
+        names = np.asarray(names)
+        if np.issubdtype(names.dtype, np.integer):
+            return names
+        unique, inverse = np.unique(names, return_inverse=True)
+        return np.array([self.code(name) for name in unique], dtype=np.intp)[inverse].reshape(names.shape)
+
+    def factor(self, name: str) -> float:
+        return float(self.production_emissions[self.code(name)])
+
+    def factors(self, names) -> np.ndarray:
+        """Factors for an array of names or codes."""
+        return self.production_emissions[self.codes(names)]
+
+_default_registry = MaterialRegistry([name for name, _ in DEFAULT_MATERIALS],
+                                     [factor for _, factor in DEFAULT_MATERIALS])
+
+def default_registry() -> MaterialRegistry:
+    """Registry used by RecyclingScenario when none is passed."""
+    return _default_registry
+
+def set_default_registry(registry: MaterialRegistry):
+    global _default_registry
+    _default_registry = registry
+
+def with_defaults(registry: MaterialRegistry) -> MaterialRegistry:
+    """`registry` plus the DEFAULT_MATERIALS it does not know by name or abbreviation."""
+    missing = [(name, factor) for name, factor in DEFAULT_MATERIALS if name not in registry]
+    if not missing:
+        return registry
+    return MaterialRegistry(registry.names + [name for name, _ in missing],
+                            np.concatenate([registry.production_emissions, [factor for _, factor in missing]]))
+
+def load_material_registry(session, make_default: bool = True) -> MaterialRegistry:
+    """Load all Material rows once and (by default) make them the registry for new scenarios."""
+    registry = with_defaults(MaterialRegistry.from_session(session))
+    if make_default:
+        set_default_registry(registry)
+    return registry
+
+def use_database_materials(session_factory=None) -> MaterialRegistry:
+    """Make the `materials` table (DATABASE_URL) the default registry for new scenarios.
+
+    Called by the analysis entry points before they build scenarios. When the database
+    cannot be reached, the default registry is kept and a note is printed.
+    """
+    try:
+        from sqlalchemy.exc import SQLAlchemyError
+        if session_factory is None:
+            from backend.db.connection import SessionLocal as session_factory
+    except ImportError as e:
+        print(f"Material database unavailable ({e}); using the default material factors")
+        return default_registry()
+    try:
+        with session_factory() as session:
+            return load_material_registry(session)
+    except SQLAlchemyError as e:
+        print(f"Material database unavailable ({type(e).__name__}); using the default material factors")
+        return default_registry()
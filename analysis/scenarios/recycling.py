@@ -1,86 +1,35 @@
 ##Calculate emissions and energy consumption for different recycling scenarios.
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import time
+
 import numpy as np
-from scipy import stats
 
-class RecyclingScenario:
-    def __init__(self, name, granulator_energy_mj, pelletizing_energy_mj, de_grid_co2_per_mj=0.161):
-        self.name = name
-        self.granulator_energy_mj = granulator_energy_mj
-        self.pelletizing_energy_mj = pelletizing_energy_mj
-        self.de_grid_co2_per_mj = de_grid_co2_per_mj
-        self.pa6_co2_per_kg = 4.45   # kg CO2 per kg material
-        self.peek_co2_per_kg = 13.70  # kg CO2 per kg material
-        self.pps_co2_per_kg = 2.13   # kg CO2 per kg material (estimated)
+from .cascade import scenario_cascade
+from .core import RecyclingScenario, default_scenarios, emissions_table, spiral_scenario
+from .materials import use_database_materials
+from ..utils.jobs import PlotJob, print_job_report, run_plot_jobs
+from ..utils.lazy import lazy_module
+from ..utils.plotting import plot_path
 
-    def calculate_emissions_with_material(self, final_weight_kg, scrap_percentage=100, material_type='PA6'):
-        """Calculate emissions for given weight and scrap percentage with specified material."""
-        # Calculate total energy
-        total_energy_mj = (self.granulator_energy_mj + self.pelletizing_energy_mj) * final_weight_kg
-        
-        # Calculate emissions from energy
-        energy_emissions = total_energy_mj * self.de_grid_co2_per_mj
-        
-        # Calculate material emissions based on material type
-        if material_type == 'PA6':
-            material_co2_per_kg = self.pa6_co2_per_kg
-        elif material_type == 'PEEK':
-            material_co2_per_kg = self.peek_co2_per_kg
-        elif material_type == 'PPS':
-            material_co2_per_kg = self.pps_co2_per_kg
-        else:
-            raise ValueError(f'Unknown material type: {material_type}')
-        
-        material_emissions = (100 - scrap_percentage) / 100 * material_co2_per_kg * final_weight_kg
-        
-        return {
-            'total_energy_mj': total_energy_mj,
-            'energy_emissions': energy_emissions,
-            'material_emissions': material_emissions,
-            'total_emissions': energy_emissions + material_emissions
-        }
-
-    def calculate_emissions(self, final_weight_kg, scrap_percentage=100):
-        """Calculate emissions for given weight and scrap percentage."""
-        # Calculate total energy
-        total_energy_mj = self.granulator_energy_mj + self.pelletizing_energy_mj
-        
-        # Calculate emissions from energy
-        energy_emissions = total_energy_mj * self.de_grid_co2_per_mj
-        
-        # Calculate material emissions (if using virgin PA6)
-        virgin_pa6_percentage = (100 - scrap_percentage) / 100
-        material_emissions = virgin_pa6_percentage * self.pa6_co2_per_kg
-        
-        # Total emissions per kg
-        total_emissions_per_kg = energy_emissions + material_emissions
-        
-        # Scale to final weight
-        total_emissions = total_emissions_per_kg * final_weight_kg
-        
-        return {
-            'total_energy_mj': total_energy_mj * final_weight_kg,
-            'energy_emissions': energy_emissions * final_weight_kg,
-            'material_emissions': material_emissions * final_weight_kg,
-            'total_emissions': total_emissions
-        }
+# matplotlib is only imported once a figure is drawn
+plt = lazy_module('matplotlib.pyplot')
+patches = lazy_module('matplotlib.patches')
 
 def print_scenario_results(scenario, weights, scrap_percentages):
     """Print results for a scenario with different weights and scrap percentages."""
     print(f"\n=== {scenario.name} ===")
     print(f"Base energy consumption: {scenario.granulator_energy_mj + scenario.pelletizing_energy_mj:.3f} MJ/kg")
     
-    for weight in weights:
+    # One broadcast call covers every weight x scrap combination (virgin PA6)
+    results = scenario.calculate_emissions_grid(weights, scrap_percentages, ['PA6'])
+    for i, weight in enumerate(weights):
         print(f"\nResults for {weight:.3f} kg final material:")
-        for scrap in scrap_percentages:
-            results = scenario.calculate_emissions(weight, scrap)
+        for j, scrap in enumerate(scrap_percentages):
             print(f"\n{scrap}% scrap material:")
-            print(f"Total energy: {results['total_energy_mj']:.6f} MJ")
-            print(f"Energy emissions: {results['energy_emissions']:.6f} kg CO2")
-            print(f"Material emissions: {results['material_emissions']:.6f} kg CO2")
-            print(f"Total emissions: {results['total_emissions']:.6f} kg CO2")
+            print(f"Total energy: {results['total_energy_mj'][i, j, 0]:.6f} MJ")
+            print(f"Energy emissions: {results['energy_emissions'][i, j, 0]:.6f} kg CO2")
+            print(f"Material emissions: {results['material_emissions'][i, j, 0]:.6f} kg CO2")
+            print(f"Total emissions: {results['total_emissions'][i, j, 0]:.6f} kg CO2")
 
 def create_materials_comparison_plot(scenarios):
     """Create a bar plot comparing different materials for 1kg production."""
@@ -91,10 +40,11 @@ def create_materials_comparison_plot(scenarios):
     fig.suptitle('CO₂ Emissions Comparison for Different Materials\n(1 kg Material)', fontsize=14, y=0.95)
     
     # Calculate emissions for each scenario and material combination
-    emissions_100 = [s.calculate_emissions_with_material(1.0, 100, 'PA6')['total_emissions'] for s in scenarios]
-    emissions_70_pa6 = [s.calculate_emissions_with_material(1.0, 70, 'PA6')['total_emissions'] for s in scenarios]
-    emissions_70_peek = [s.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions'] for s in scenarios]
-    emissions_70_pps = [s.calculate_emissions_with_material(1.0, 70, 'PPS')['total_emissions'] for s in scenarios]
+    table = emissions_table(scenarios, [100, 70], ['PA6', 'PEEK', 'PPS'])
+    emissions_100 = table[:, 0, 0]
+    emissions_70_pa6 = table[:, 1, 0]
+    emissions_70_peek = table[:, 1, 1]
+    emissions_70_pps = table[:, 1, 2]
     
     # Set up bar positions
     x = np.arange(len(scenarios))
@@ -119,7 +69,7 @@ def create_materials_comparison_plot(scenarios):
     plt.tight_layout(rect=[0, 0, 0.85, 0.95])
     
     # Save plot
-    plt.savefig('materials_comparison.png', 
+    plt.savefig(plot_path('processes', 'materials_comparison.png'), 
                 dpi=300, 
                 bbox_inches='tight',
                 facecolor='white',
@@ -157,9 +107,10 @@ def create_comparison_plots(scenarios, weights, scrap_percentages):
     style_axis(ax1, 'Total Energy Consumption per kg')
     
     # Plot 2: CO2 emissions for 1kg (100%, 70% PA6, 70% PEEK)
-    emissions_100 = [s.calculate_emissions_with_material(1.0, 100, 'PA6')['total_emissions'] for s in scenarios]
-    emissions_70_pa6 = [s.calculate_emissions_with_material(1.0, 70, 'PA6')['total_emissions'] for s in scenarios]
-    emissions_70_peek = [s.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions'] for s in scenarios]
+    table = emissions_table(scenarios, [100, 70], ['PA6', 'PEEK'])
+    emissions_100 = table[:, 0, 0]
+    emissions_70_pa6 = table[:, 1, 0]
+    emissions_70_peek = table[:, 1, 1]
     
     x = np.arange(n_scenarios)
     width = 0.25
@@ -181,7 +132,7 @@ def create_comparison_plots(scenarios, weights, scrap_percentages):
     plt.tight_layout(rect=[0, 0, 0.85, 0.95])
     
     # Save with high quality
-    plt.savefig('recycling_scenarios_comparison.png', 
+    plt.savefig(plot_path('processes', 'recycling_scenarios_comparison.png'), 
                 dpi=300, 
                 bbox_inches='tight',
                 facecolor='white',
@@ -192,28 +143,10 @@ def create_cascade_plot(scenario, n_cycles=10):
     """Create a plot showing emissions over multiple recycling cycles."""
     plt.style.use('default')
     
-    # Calculate emissions for initial production (70% recycled + 30% virgin PEEK)
-    initial_emissions = scenario.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions']
-    
-    # Calculate emissions for subsequent cycles (100% recycled, using spiral grinding)
-    cycle_emissions = []
-    cumulative_emissions = [initial_emissions]
-    
-    # Create recycling scenario with spiral grinding
-    spiral_scenario = RecyclingScenario(
-        "Spiral Grinding + Sphera Pelletization",
-        granulator_energy_mj=0.05,  # Spiral grinding energy
-        pelletizing_energy_mj=1.1    # Sphera pelletization energy
-    )
-    
-    # Calculate emissions for each cycle
-    for cycle in range(1, n_cycles):
-        cycle_emission = spiral_scenario.calculate_emissions_with_material(1.0, 100, 'PEEK')['total_emissions']
-        cycle_emissions.append(cycle_emission)
-        cumulative_emissions.append(cumulative_emissions[-1] + cycle_emission)
-    
-    # Calculate average emissions per cycle
-    average_emissions = [cum_em / (i + 1) for i, cum_em in enumerate(cumulative_emissions)]
+    # Initial production (70% recycled + 30% virgin PEEK), then 100% recycled cycles with spiral grinding
+    result = scenario_cascade(scenario, spiral_scenario(), 'PEEK', 70, n_cycles)
+    cumulative_emissions = result.cumulative_emissions
+    average_emissions = result.average_emissions
     
     # Create the visualization
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12), height_ratios=[1, 1.5])
@@ -233,33 +166,22 @@ def create_cascade_plot(scenario, n_cycles=10):
     ax2.set_xlabel('Number of Recycling Cycles', fontsize=11)
     ax2.grid(True, linestyle='--', alpha=0.7)
     ax2.set_title('Average CO₂ Emissions per Recycling Cycle', pad=20, fontsize=12)
+    
+    # Adjust layout and save
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    plt.savefig(plot_path('processes', 'peek_cascade_recycling.png'), dpi=300, bbox_inches='tight')
+    plt.close()
 
 def create_cascade_plot_2(scenario, n_cycles=10):
     """Create a plot showing emissions over multiple recycling cycles, with cumulative graph starting at 0."""
     plt.style.use('default')
     
-    # Calculate emissions for initial production (70% recycled + 30% virgin PEEK)
-    initial_emissions = scenario.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions']
-    
-    # Calculate emissions for subsequent cycles (100% recycled, using spiral grinding)
-    cycle_emissions = [initial_emissions]  # Start with initial emissions
-    cumulative_emissions = [initial_emissions]  # Start with initial emissions
-    
-    # Create recycling scenario with spiral grinding
-    spiral_scenario = RecyclingScenario(
-        "Spiral Grinding + Sphera Pelletization",
-        granulator_energy_mj=0.05,  # Spiral grinding energy
-        pelletizing_energy_mj=1.1    # Sphera pelletization energy
-    )
-    
-    # Calculate emissions for each cycle
-    for cycle in range(1, n_cycles):
-        cycle_emission = spiral_scenario.calculate_emissions_with_material(1.0, 100, 'PEEK')['total_emissions']
-        cycle_emissions.append(cycle_emission)
-        cumulative_emissions.append(cumulative_emissions[-1] + cycle_emission)
-    
-    # Calculate average emissions per cycle
-    average_emissions = [cum_em / (i + 1) for i, cum_em in enumerate(cumulative_emissions)]
+    # Initial production (70% recycled + 30% virgin PEEK), then 100% recycled cycles with spiral grinding
+    result = scenario_cascade(scenario, spiral_scenario(), 'PEEK', 70, n_cycles)
+    initial_emissions = result.cycle_emissions[0]
+    subsequent_emissions = result.cycle_emissions[1] if n_cycles > 1 else initial_emissions
+    cumulative_emissions = result.cumulative_emissions
+    average_emissions = result.average_emissions
     
     # Create the visualization
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12), height_ratios=[1, 1.5])
@@ -283,7 +205,7 @@ def create_cascade_plot_2(scenario, n_cycles=10):
     
     # Add text box with key information
     info_text = f'Initial cycle (30% virgin PEEK): {initial_emissions:.3f} kg CO₂\n'
-    info_text += f'Subsequent cycles (100% recycled): {cycle_emissions[0]:.3f} kg CO₂\n'
+    info_text += f'Subsequent cycles (100% recycled): {subsequent_emissions:.3f} kg CO₂\n'
     info_text += f'Average emissions after {n_cycles} cycles: {average_emissions[-1]:.3f} kg CO₂'
     
     plt.figtext(0.15, 0.02, info_text, fontsize=10, bbox=dict(facecolor='white', alpha=0.8))
@@ -292,7 +214,7 @@ def create_cascade_plot_2(scenario, n_cycles=10):
     plt.tight_layout(rect=[0, 0.05, 1, 0.95])
     
     # Save plot
-    plt.savefig('peek_cascade_recycling2.png', dpi=300, bbox_inches='tight')
+    plt.savefig(plot_path('processes', 'peek_cascade_recycling2.png'), dpi=300, bbox_inches='tight')
     plt.close()
 
 def create_recycling_process_diagram():
@@ -361,7 +283,7 @@ def create_recycling_process_diagram():
     ax.spines['polar'].set_visible(False)
     
     # Save the plot
-    plt.savefig('recycling_process.png', 
+    plt.savefig(plot_path('processes', 'recycling_process.png'), 
                 dpi=300, 
                 bbox_inches='tight',
                 facecolor='white',
@@ -406,62 +328,47 @@ def create_energy_comparison_plot(scenarios):
     plt.tight_layout(rect=[0, 0, 0.85, 0.95])
     
     # Save plot
-    plt.savefig('energy_consumption.png', 
+    plt.savefig(plot_path('processes', 'energy_consumption.png'), 
                 dpi=300, 
                 bbox_inches='tight',
                 facecolor='white',
                 edgecolor='none')
     plt.close()
 
-def main():
-    # Define scenarios with shorter names for better plot readability
-    scenario1 = RecyclingScenario(
-        "Aggregated Process\n(Sphera)",
-        granulator_energy_mj=2.65,
-        pelletizing_energy_mj=0.0
-    )
-    
-    scenario2 = RecyclingScenario(
-        "Separate Processes\n(Sphera)",
-        granulator_energy_mj=0.33,
-        pelletizing_energy_mj=1.1
-    )
-    
-    scenario3 = RecyclingScenario(
-        "Hybrid Process\n(Spiral + Sphera)",
-        granulator_energy_mj=0.05,
-        pelletizing_energy_mj=1.1
-    )
-    
-    scenario4 = RecyclingScenario(
-        "Alternative Process\n(Sphera + PIE)",
-        granulator_energy_mj=0.33,
-        pelletizing_energy_mj=2.2716
-    )
-    
-    # Define weights to analyze
-    weights = [1.0, 0.07]  # 1 kg and 0.07 kg
-    scrap_percentages = [100, 70]  # 100% scrap and 70% scrap
-    
-    scenario5 = RecyclingScenario(
-        "Incineration",
-        granulator_energy_mj=2.9/0.0581,  # Convert CO2 emissions back to energy using grid factor
-        pelletizing_energy_mj=0.0
-    )
-    
+# Weights and scrap shares analyzed by default
+WEIGHTS = [1.0, 0.07]  # 1 kg and 0.07 kg
+SCRAP_PERCENTAGES = [100, 70]  # 100% scrap and 70% scrap
+
+def figure_jobs(scenarios, weights=WEIGHTS, scrap_percentages=SCRAP_PERCENTAGES):
+    """Plot jobs for every figure of this module; scenarios[2] is the hybrid process."""
+    hybrid = scenarios[2]
+    
+    def job(name, func, *args):
+        return PlotJob(name, func, args, output=f'processes/{name}.png')
+    
+    return [
+        job('recycling_scenarios_comparison', create_comparison_plots, scenarios, weights, scrap_percentages),
+        job('peek_cascade_recycling', create_cascade_plot, hybrid),
+        job('peek_cascade_recycling2', create_cascade_plot_2, hybrid),
+        job('recycling_process', create_recycling_process_diagram),
+        job('materials_comparison', create_materials_comparison_plot, scenarios),
+        job('energy_consumption', create_energy_comparison_plot, scenarios),
+        job('pa6_comparison', create_pa6_comparison_plot, scenarios),
+        job('hybrid_process_analysis', create_hybrid_process_analysis, hybrid),
+        job('spiral_vs_sphera_comparison', create_spiral_vs_sphera_comparison)
+    ]
+
+def main(max_workers=None, force=False):
+    use_database_materials()
     # Calculate and print results for each scenario
-    scenarios = [scenario1, scenario2, scenario3, scenario4, scenario5]
+    scenarios = default_scenarios()
     for scenario in scenarios:
-        print_scenario_results(scenario, weights, scrap_percentages)
-    
-    # Create visualizations
-    create_comparison_plots(scenarios, weights, scrap_percentages)
-    create_cascade_plot(scenario3)
-    create_recycling_process_diagram()
-    create_materials_comparison_plot(scenarios)
-    create_energy_comparison_plot(scenarios)
-    create_pa6_comparison_plot(scenarios)
-    create_hybrid_process_analysis(scenario3)
+        print_scenario_results(scenario, WEIGHTS, SCRAP_PERCENTAGES)
+    
+    # Render the visualizations in parallel
+    start = time.perf_counter()
+    results = run_plot_jobs(figure_jobs(scenarios), max_workers=max_workers, force=force)
+    print_job_report(results, time.perf_counter() - start)
 
 def create_pa6_comparison_plot(scenarios):
     """Create a bar plot comparing only PA6 scenarios (100% recyclate vs 70% recyclate + 30% virgin)."""
@@ -473,8 +380,9 @@ def create_pa6_comparison_plot(scenarios):
                  fontsize=14, y=0.95)
     
     # Calculate emissions for each scenario
-    emissions_100 = [s.calculate_emissions_with_material(1.0, 100, 'PA6')['total_emissions'] for s in scenarios]
-    emissions_70_pa6 = [s.calculate_emissions_with_material(1.0, 70, 'PA6')['total_emissions'] for s in scenarios]
+    table = emissions_table(scenarios, [100, 70], ['PA6'])
+    emissions_100 = table[:, 0, 0]
+    emissions_70_pa6 = table[:, 1, 0]
     
     # Set up bar positions
     x = np.arange(len(scenarios))
@@ -497,7 +405,7 @@ def create_pa6_comparison_plot(scenarios):
     plt.tight_layout(rect=[0, 0, 0.85, 0.95])
     
     # Save plot
-    plt.savefig('pa6_comparison.png', 
+    plt.savefig(plot_path('processes', 'pa6_comparison.png'), 
                 dpi=300, 
                 bbox_inches='tight',
                 facecolor='white',
@@ -524,12 +432,8 @@ def create_hybrid_process_analysis(scenario):
         scenario.granulator_energy_mj + scenario.pelletizing_energy_mj
     ]
     
-    co2_values = [
-        scenario.calculate_emissions_with_material(1.0, 100, 'PA6')['total_emissions'],
-        scenario.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions'],
-        scenario.calculate_emissions_with_material(1.0, 70, 'PA6')['total_emissions'],
-        scenario.calculate_emissions_with_material(1.0, 70, 'PPS')['total_emissions']
-    ]
+    table = scenario.calculate_emissions_grid([1.0], [100, 70], ['PA6', 'PEEK', 'PPS'])['total_emissions'][0]
+    co2_values = [table[0, 0], table[1, 1], table[1, 0], table[1, 2]]
     
     # Colors
     colors = ['#2ecc71', '#ff7f0e', '#000000', '#808080']
@@ -555,10 +459,7 @@ def create_hybrid_process_analysis(scenario):
     x = range(n_cycles)
     
     # Calculate emissions for each material over cycles
-    emissions_100 = [scenario.calculate_emissions_with_material(1.0, 100, 'PA6')['total_emissions']] * n_cycles
-    emissions_peek = [scenario.calculate_emissions_with_material(1.0, 70, 'PEEK')['total_emissions']] * n_cycles
-    emissions_pa6 = [scenario.calculate_emissions_with_material(1.0, 70, 'PA6')['total_emissions']] * n_cycles
-    emissions_pps = [scenario.calculate_emissions_with_material(1.0, 70, 'PPS')['total_emissions']] * n_cycles
+    emissions_100, emissions_peek, emissions_pa6, emissions_pps = (np.full(n_cycles, value) for value in co2_values)
     
     ax3.plot(x, emissions_100, 'o-', color=colors[0], label='100% Scrap', linewidth=2)
     ax3.plot(x, emissions_peek, 's-', color=colors[1], label='70% + PEEK', linewidth=2)
@@ -591,7 +492,7 @@ def create_hybrid_process_analysis(scenario):
     plt.tight_layout(rect=[0, 0, 0.9, 0.95])
     
     # Save plot
-    plt.savefig('hybrid_process_analysis.png',
+    plt.savefig(plot_path('processes', 'hybrid_process_analysis.png'),
                 dpi=300,
                 bbox_inches='tight',
                 facecolor='white',
@@ -631,10 +532,8 @@ def create_spiral_vs_sphera_comparison():
     
     # Adjust layout and save
     plt.tight_layout()
-    plt.savefig('spiral_vs_sphera_comparison.png', dpi=300, bbox_inches='tight')
+    plt.savefig(plot_path('processes', 'spiral_vs_sphera_comparison.png'), dpi=300, bbox_inches='tight')
     plt.close()
 
 if __name__ == "__main__":
-    # Create the spiral vs Sphera comparison plot
-    create_spiral_vs_sphera_comparison()
     main()
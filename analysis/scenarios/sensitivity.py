@@ -0,0 +1,228 @@
+"""Global sensitivity analysis (Morris and Sobol) over recycling scenario parameters."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .core import default_scenarios
+from .materials import use_database_materials
+from .uncertainty import evaluate_scenario, point_estimates
+from ..utils.jobs import PlotJob
+from ..utils.lazy import lazy_module
+from ..utils.plotting import setup_plot_style, setup_grid, save_plot, tornado_plot, plot_path
+
+plt = lazy_module('matplotlib.pyplot')
+qmc = lazy_module('scipy.stats.qmc')
+
+# Parameters analysed by default, in table order
+SENSITIVITY_PARAMETERS = (
+    'granulator_energy_mj',
+    'pelletizing_energy_mj',
+    'de_grid_co2_per_mj',
+    'virgin_co2_per_kg',
+    'scrap_percentage'
+)
+
+def default_bounds(scenario, material_type='PA6', spread=0.2, scrap_range=(50, 100),
+                   final_weight_kg=1.0) -> Dict[str, Tuple[float, float]]:
+    """Bounds of +/- `spread` around the scenario's point estimates and a range for the scrap share."""
+    points = point_estimates(scenario, final_weight_kg, material_type=material_type)
+    bounds = {name: (points[name] * (1 - spread), points[name] * (1 + spread)) for name in SENSITIVITY_PARAMETERS}
+    bounds['scrap_percentage'] = scrap_range
+    return bounds
+
+def _model(scenario, names, X, material_type, final_weight_kg):
+    values = {name: X[:, i] for i, name in enumerate(names)}
+    results = evaluate_scenario(scenario, values, final_weight_kg, material_type=material_type)
+    return np.broadcast_to(results['total_emissions'], (len(X),)).astype(float)
+
+def evaluate(scenario, bounds: Dict[str, Tuple[float, float]], X: np.ndarray, material_type='PA6',
+             final_weight_kg=1.0, max_workers: Optional[int] = 1, chunk_size: int = 200_000) -> np.ndarray:
+    """Total emissions for every row of the sample matrix X (columns in `bounds` order).
+
+    Rows are evaluated vectorized; with max_workers > 1 (or None for all cores) chunks of
+    rows are spread over a process pool.
+    """
+    names = list(bounds)
+    chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        return np.concatenate([_model(scenario, names, chunk, material_type, final_weight_kg) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        n = len(chunks)
+        parts = pool.map(_model, [scenario] * n, [names] * n, chunks, [material_type] * n, [final_weight_kg] * n)
+        return np.concatenate(list(parts))
+
+def _scale(unit, bounds):
+    low = np.array([b[0] for b in bounds.values()], dtype=float)
+    high = np.array([b[1] for b in bounds.values()], dtype=float)
+    return low + unit * (high - low)
+
+def sobol_indices(scenario, bounds: Dict[str, Tuple[float, float]], n: int = 2 ** 14, material_type='PA6',
+                  final_weight_kg=1.0, seed: int = 0, max_workers: Optional[int] = 1) -> pd.DataFrame:
+    """First-order and total Sobol indices from Saltelli sample matrices.
+
+    A and B are the two halves of a scrambled Sobol' sequence of dimension 2k; AB_i is A with
+    column i taken from B. All n * (k + 2) rows are evaluated in one batch. First-order
+    indices use the Saltelli (2010) estimator, total indices the Jansen estimator.
+    """
+    names = list(bounds)
+    k = len(names)
+    base = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random(n)
+    A = _scale(base[:, :k], bounds)
+    B = _scale(base[:, k:], bounds)
+    AB = np.repeat(A[np.newaxis], k, axis=0)
+    AB[np.arange(k), :, np.arange(k)] = B[:, np.arange(k)].T
+
+    y = evaluate(scenario, bounds, np.vstack([A, B, AB.reshape(k * n, k)]), material_type,
+                 final_weight_kg, max_workers)
+    f_A, f_B, f_AB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+    variance = np.var(np.concatenate([f_A, f_B]))
+    if variance == 0:
+        first, total = np.zeros(k), np.zeros(k)
+    else:
+        first = np.mean(f_B * (f_AB - f_A), axis=1) / variance
+        total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / variance
+
+    rows = []
+    for i, name in enumerate(names):
+        rows.append({'parameter': name, 'method': 'sobol', 'metric': 'S1', 'value': first[i]})
+        rows.append({'parameter': name, 'method': 'sobol', 'metric': 'ST', 'value': total[i]})
+    return pd.DataFrame(rows)
+
+def morris_elementary_effects(scenario, bounds: Dict[str, Tuple[float, float]], n_trajectories: int = 100,
+                              levels: int = 4, material_type='PA6', final_weight_kg=1.0, seed: int = 0,
+                              max_workers: Optional[int] = 1) -> pd.DataFrame:
+    """Morris screening: mu* (mean absolute effect) and sigma of the elementary effects.
+
+    Effects are per unit of the normalized [0, 1] parameter range, so they are comparable
+    across parameters. All trajectory points are evaluated in one batch.
+    """
+    names = list(bounds)
+    k = len(names)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+
+    # Start points on the grid such that one step of +/- delta stays inside [0, 1]
+    directions = rng.choice([-1.0, 1.0], size=(n_trajectories, k))
+    start = rng.choice(grid[grid <= 1 - delta + 1e-12], size=(n_trajectories, k))
+    start = np.where(directions > 0, start, start + delta)
+    order = np.argsort(rng.random((n_trajectories, k)), axis=1)
+
+    points = np.empty((n_trajectories, k + 1, k))
+    points[:, 0] = start
+    rows = np.arange(n_trajectories)
+    for step in range(k):
+        points[:, step + 1] = points[:, step]
+        moved = order[:, step]
+        points[rows, step + 1, moved] += directions[rows, moved] * delta
+
+    y = evaluate(scenario, bounds, _scale(points.reshape(-1, k), bounds), material_type,
+                 final_weight_kg, max_workers).reshape(n_trajectories, k + 1)
+    effects = np.empty((n_trajectories, k))
+    effects[rows[:, np.newaxis], order] = np.diff(y, axis=1) / (directions[rows[:, np.newaxis], order] * delta)
+
+    table = []
+    for i, name in enumerate(names):
+        table.append({'parameter': name, 'method': 'morris', 'metric': 'mu_star', 'value': np.abs(effects[:, i]).mean()})
+        table.append({'parameter': name, 'method': 'morris', 'metric': 'sigma', 'value': effects[:, i].std(ddof=1)})
+    return pd.DataFrame(table)
+
+def one_at_a_time_swings(scenario, bounds: Dict[str, Tuple[float, float]], material_type='PA6',
+                         final_weight_kg=1.0) -> pd.DataFrame:
+    """Total emissions with each parameter at its low and high bound and the others at their midpoint."""
+    names = list(bounds)
+    k = len(names)
+    mid = np.array([(low + high) / 2 for low, high in bounds.values()])
+    X = np.tile(mid, (2 * k + 1, 1))
+    for i, (low, high) in enumerate(bounds.values()):
+        X[2 * i, i] = low
+        X[2 * i + 1, i] = high
+    y = _model(scenario, names, X, material_type, final_weight_kg)
+    return pd.DataFrame({
+        'parameter': names,
+        'low': y[0:2 * k:2],
+        'high': y[1:2 * k:2],
+        'baseline': y[-1]
+    })
+
+def run_sensitivity_analysis(scenario, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                             material_type='PA6', n_sobol: int = 2 ** 14, n_trajectories: int = 100,
+                             seed: int = 0, max_workers: Optional[int] = 1) -> pd.DataFrame:
+    """Morris and Sobol indices for one scenario as a tidy table (parameter, method, metric, value)."""
+    bounds = bounds or default_bounds(scenario, material_type)
+    table = pd.concat([
+        morris_elementary_effects(scenario, bounds, n_trajectories, material_type=material_type,
+                                  seed=seed, max_workers=max_workers),
+        sobol_indices(scenario, bounds, n_sobol, material_type=material_type, seed=seed,
+                      max_workers=max_workers)
+    ], ignore_index=True)
+    table.insert(0, 'scenario', scenario.name)
+    return table
+
+def create_sensitivity_tornado_plot(scenario, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                                    material_type='PA6', table: Optional[pd.DataFrame] = None,
+                                    filename='sensitivity_tornado.png'):
+    """Tornado plot of one-at-a-time swings next to the Sobol total-order indices."""
+    bounds = bounds or default_bounds(scenario, material_type)
+    swings = one_at_a_time_swings(scenario, bounds, material_type)
+    if table is None:
+        table = sobol_indices(scenario, bounds, material_type=material_type)
+
+    setup_plot_style()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig.suptitle(f'Sensitivity of CO₂ Emissions: {scenario.name}\n(1 kg Material, {material_type})', fontsize=14, y=0.98)
+
+    tornado_plot(ax1, swings['parameter'], swings['low'], swings['high'], center=swings['baseline'].iloc[0])
+    ax1.set_xlabel('CO₂ Emissions (kg)', fontsize=11)
+    ax1.set_title('Output Range per Parameter (others at midpoint)', pad=20, fontsize=12)
+
+    sobol = table[(table['method'] == 'sobol')].pivot(index='parameter', columns='metric', values='value')
+    sobol = sobol.sort_values('ST')
+    y = np.arange(len(sobol))
+    ax2.barh(y - 0.2, sobol['ST'], 0.4, label='Total order (ST)', color='#ff7f0e')
+    ax2.barh(y + 0.2, sobol['S1'], 0.4, label='First order (S1)', color='#2ecc71')
+    ax2.set_yticks(y)
+    ax2.set_yticklabels(sobol.index)
+    ax2.set_xlabel('Sobol Index', fontsize=11)
+    ax2.set_title('Sobol Indices', pad=20, fontsize=12)
+    setup_grid(ax2, axis='x')
+    ax2.legend(loc='lower right', fontsize=10)
+
+    plt.tight_layout(rect=[0, 0, 1, 0.93])
+    save_plot(fig, plot_path('sensitivity', filename))
+
+def tornado_filename(scenario) -> str:
+    return 'sensitivity_tornado_' + scenario.name.split('\n')[0].lower().replace(' ', '_') + '.png'
+
+# Routes of core.default_scenarios that get a tornado plot by default
+SENSITIVITY_ROUTES = ('Separate Processes', 'Hybrid Process')
+
+def sensitivity_scenarios():
+    """The SENSITIVITY_ROUTES scenarios, taken from the shared scenario set."""
+    return [scenario for scenario in default_scenarios() if scenario.name.split('\n')[0] in SENSITIVITY_ROUTES]
+
+def figure_jobs(scenarios: Optional[Sequence] = None):
+    """Plot jobs for the tornado figure of each scenario."""
+    return [
+        PlotJob(tornado_filename(scenario)[:-len('.png')], create_sensitivity_tornado_plot, (scenario,),
+                {'filename': tornado_filename(scenario)}, output='sensitivity/' + tornado_filename(scenario))
+        for scenario in scenarios or sensitivity_scenarios()
+    ]
+
+def main(scenarios: Optional[Sequence] = None):
+    if scenarios is None:
+        use_database_materials()
+    scenarios = scenarios or sensitivity_scenarios()
+    tables = [run_sensitivity_analysis(scenario) for scenario in scenarios]
+    table = pd.concat(tables, ignore_index=True)
+    print(table.to_string(index=False))
+    for scenario, scenario_table in zip(scenarios, tables):
+        create_sensitivity_tornado_plot(scenario, table=scenario_table, filename=tornado_filename(scenario))
+
+if __name__ == "__main__":
+    main()
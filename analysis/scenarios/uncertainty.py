@@ -0,0 +1,179 @@
+"""Monte Carlo uncertainty propagation for recycling scenarios.
+
+Every uncertain parameter gets a distribution; N draws are evaluated through
+`RecyclingScenario.calculate_emissions_with_material` as arrays, so a chunk of draws is a
+single vectorized call per scenario. Chunks are spread over a process pool, each with its
+own child seed, so results only depend on `seed` and `chunk_size`.
+"""
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Parameters that can be given a distribution
+SCENARIO_PARAMETERS = ('granulator_energy_mj', 'pelletizing_energy_mj', 'de_grid_co2_per_mj')
+PARAMETERS = SCENARIO_PARAMETERS + ('virgin_co2_per_kg', 'scrap_percentage', 'final_weight_kg')
+
+# Draws are clipped to these ranges; normal and triangular tails would otherwise leave them
+PARAMETER_BOUNDS = {name: (0.0, np.inf) for name in PARAMETERS}
+PARAMETER_BOUNDS['scrap_percentage'] = (0.0, 100.0)
+
+OUTPUTS = ('total_energy_mj', 'energy_emissions', 'material_emissions', 'total_emissions')
+
+@dataclass(frozen=True)
+class Relative:
+    """Distribution around each scenario's own point estimate.
+
+    kind: 'normal' (spread = coefficient of variation), 'lognormal' (spread = sigma of the
+    log, mean preserved), 'uniform' or 'triangular' (spread = +/- fraction of the estimate).
+    """
+    kind: str
+    spread: float
+
+    def multipliers(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.kind == 'normal':
+            # Physical quantities cannot go negative
+            return np.maximum(rng.normal(1.0, self.spread, size), 0.0)
+        if self.kind == 'lognormal':
+            return rng.lognormal(-0.5 * self.spread ** 2, self.spread, size)
+        if self.kind == 'uniform':
+            return rng.uniform(1.0 - self.spread, 1.0 + self.spread, size)
+        if self.kind == 'triangular':
+            return rng.triangular(1.0 - self.spread, 1.0, 1.0 + self.spread, size)
+        raise ValueError(f'Unknown distribution kind: {self.kind}')
+
+@dataclass
+class MonteCarloResult:
+    """Summary of the Monte Carlo draws for one scenario."""
+    scenario_name: str
+    n_samples: int
+    mean: Dict[str, float]
+    std: Dict[str, float]
+    percentiles: Dict[str, Dict[float, float]]
+    histogram: Tuple[np.ndarray, np.ndarray]  # counts, bin edges of total_emissions
+    samples: Optional[Dict[str, np.ndarray]] = field(default=None, repr=False)
+
+def point_estimates(scenario, final_weight_kg=1.0, scrap_percentage=70, material_type='PA6') -> Dict[str, float]:
+    """Point value of every parameter for `scenario`."""
+    return {
+        'granulator_energy_mj': scenario.granulator_energy_mj,
+        'pelletizing_energy_mj': scenario.pelletizing_energy_mj,
+        'de_grid_co2_per_mj': scenario.de_grid_co2_per_mj,
+        'virgin_co2_per_kg': scenario.material_co2_per_kg(material_type),
+        'scrap_percentage': scrap_percentage,
+        'final_weight_kg': final_weight_kg
+    }
+
+def evaluate_scenario(scenario, values: Dict[str, np.ndarray], final_weight_kg=1.0,
+                      scrap_percentage=70, material_type='PA6') -> Dict[str, np.ndarray]:
+    """Evaluate `calculate_emissions_with_material` with parameters replaced by arrays of draws.
+
+    `values` maps names from PARAMETERS to arrays; parameters left out keep their point value.
+    """
+    sampled = copy.copy(scenario)
+    for name in SCENARIO_PARAMETERS:
+        if name in values:
+            setattr(sampled, name, values[name])
+    if 'virgin_co2_per_kg' in values:
+        code = scenario.materials.code(material_type)
+        sampled.material_overrides = {**scenario.material_overrides, code: values['virgin_co2_per_kg']}
+    return sampled.calculate_emissions_with_material(
+        values.get('final_weight_kg', final_weight_kg),
+        values.get('scrap_percentage', scrap_percentage),
+        material_type
+    )
+
+def _draw(distributions, rng, size):
+    """Draw each parameter once per chunk; the same draws are shared by all scenarios."""
+    draws = {}
+    for name in PARAMETERS:
+        if name not in distributions:
+            continue
+        distribution = distributions[name]
+        if isinstance(distribution, Relative):
+            draws[name] = ('relative', distribution.multipliers(rng, size))
+        else:
+            # Absolute distribution, e.g. a frozen scipy.stats distribution
+            draws[name] = ('absolute', np.asarray(distribution.rvs(size=size, random_state=rng), dtype=float))
+    return draws
+
+def _run_chunk(scenarios, distributions, size, seed_sequence, final_weight_kg, scrap_percentage,
+               material_type, outputs):
+    rng = np.random.default_rng(seed_sequence)
+    draws = _draw(distributions, rng, size)
+    chunk = []
+    for scenario in scenarios:
+        points = point_estimates(scenario, final_weight_kg, scrap_percentage, material_type)
+        values = {
+            name: np.clip(points[name] * sample if how == 'relative' else sample, *PARAMETER_BOUNDS[name])
+            for name, (how, sample) in draws.items()
+        }
+        results = evaluate_scenario(scenario, values, final_weight_kg, scrap_percentage, material_type)
+        # Broadcast in case none of the sampled parameters reaches an output
+        chunk.append({key: np.broadcast_to(results[key], (size,)).astype(np.float32) for key in outputs})
+    return chunk
+
+def run_monte_carlo(scenarios: Sequence, distributions: Dict, n_samples: int = 100_000,
+                    final_weight_kg=1.0, scrap_percentage=70, material_type='PA6',
+                    seed: int = 0, chunk_size: int = 250_000, max_workers: Optional[int] = None,
+                    percentiles=(2.5, 5, 25, 50, 75, 95, 97.5), bins: int = 50,
+                    outputs=('total_emissions',), keep_samples: bool = False) -> List[MonteCarloResult]:
+    """Propagate parameter uncertainty through each scenario with `n_samples` draws.
+
+    `distributions` maps names from PARAMETERS to a `Relative` distribution or to any object
+    with an `rvs(size, random_state)` method (e.g. `scipy.stats.norm(0.161, 0.02)`).
+    Draws outside PARAMETER_BOUNDS are clipped to them. `outputs` selects which of OUTPUTS
+    are summarized (total_emissions always is).
+    Use max_workers=1 to run without a process pool.
+    """
+    if n_samples < 1 or chunk_size < 1:
+        raise ValueError('n_samples and chunk_size must be at least 1')
+    unknown = set(distributions) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {sorted(unknown)}')
+    if 'total_emissions' not in outputs:
+        outputs = tuple(outputs) + ('total_emissions',)
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (scenarios, distributions, size, seed_sequence, final_weight_kg, scrap_percentage, material_type, outputs)
+        for size, seed_sequence in zip(sizes, seeds)
+    ]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(args) == 1:
+        chunks = [_run_chunk(*chunk_args) for chunk_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            chunks = list(pool.map(_run_chunk, *zip(*args)))
+
+    results = []
+    for index, scenario in enumerate(scenarios):
+        samples = {key: np.concatenate([chunk[index][key] for chunk in chunks]) for key in outputs}
+        results.append(MonteCarloResult(
+            scenario_name=scenario.name,
+            n_samples=n_samples,
+            mean={key: float(values.mean(dtype=np.float64)) for key, values in samples.items()},
+            std={key: float(values.std(dtype=np.float64)) for key, values in samples.items()},
+            percentiles={
+                key: dict(zip(percentiles, np.percentile(values, percentiles).tolist()))
+                for key, values in samples.items()
+            },
+            histogram=np.histogram(samples['total_emissions'], bins=bins),
+            samples=samples if keep_samples else None
+        ))
+    return results
+
+def print_monte_carlo_results(results: Sequence[MonteCarloResult], output='total_emissions'):
+    """Print mean and percentile band of one output for each scenario."""
+    for result in results:
+        bounds = result.percentiles[output]
+        low, high = min(bounds), max(bounds)
+        print(f"\n=== {result.scenario_name} ({result.n_samples} draws) ===")
+        print(f"Mean {output}: {result.mean[output]:.6f} (std {result.std[output]:.6f})")
+        print(f"P{low:g}-P{high:g}: {bounds[low]:.6f} - {bounds[high]:.6f}")
@@ -0,0 +1,120 @@
+"""Render figure functions as independent jobs, optionally in a process pool.
+
+Each job is a module-level figure function plus its arguments; the function saves its
+own output. Workers use the non-interactive Agg backend, so jobs can run on every core.
+Jobs that declare their output are skipped while the content hash recorded in the plot
+manifest still matches (see plot_cache.py).
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+@dataclass
+class PlotJob:
+    """One figure: `func(*args, **kwargs)` renders and saves it.
+
+    `output` is the saved file relative to the plots directory, e.g.
+    'processes/pa6_comparison.png'; jobs without one are always rendered.
+    """
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: Dict = field(default_factory=dict)
+    output: Optional[str] = None
+
+@dataclass
+class JobResult:
+    name: str
+    seconds: float
+    error: Optional[str] = None
+    skipped: bool = False
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def _init_worker(registry):
+    # Scenarios built inside a job use the parent's material registry (e.g. loaded from the database)
+    from ..scenarios.materials import set_default_registry
+    set_default_registry(registry)
+    _use_agg()
+
+def _render(job: PlotJob) -> JobResult:
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    try:
+        job.func(*job.args, **job.kwargs)
+    except Exception:
+        return JobResult(job.name, time.perf_counter() - start, traceback.format_exc())
+    finally:
+        plt.close('all')
+    return JobResult(job.name, time.perf_counter() - start)
+
+def _check_unique(jobs: Sequence[PlotJob]):
+    for attribute in ('name', 'output'):
+        values = [getattr(job, attribute) for job in jobs if getattr(job, attribute) is not None]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f'Plot jobs with the same {attribute}: {duplicates}')
+
+def run_plot_jobs(jobs: Sequence[PlotJob], max_workers: Optional[int] = None, use_cache: bool = True,
+                  force: bool = False) -> List[JobResult]:
+    """Render all jobs and return their timings in job order.
+
+    With `use_cache`, jobs whose output is up to date in the plot manifest are skipped
+    unless `force` is set. A failing job does not stop the others; its traceback is kept
+    in `JobResult.error`. Use max_workers=1 to render in the current process.
+    """
+    _check_unique(jobs)
+    results = {}
+    pending = list(jobs)
+    if use_cache:
+        from .plot_cache import PlotManifest, job_key, style_fingerprint
+        manifest = PlotManifest()
+        style = style_fingerprint()
+        keys = {job.name: job_key(job, style) for job in jobs if job.output}
+        if not force:
+            for job in jobs:
+                if job.name in keys and manifest.is_current(job.output, keys[job.name]):
+                    results[job.name] = JobResult(job.name, 0.0, skipped=True)
+            pending = [job for job in jobs if job.name not in results]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(pending))
+    if workers == 1:
+        _use_agg()
+        rendered = [_render(job) for job in pending]
+    elif pending:
+        from ..scenarios.materials import default_registry
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(default_registry(),)) as pool:
+            rendered = list(pool.map(_render, pending))
+    else:
+        rendered = []
+
+    for job, result in zip(pending, rendered):
+        results[job.name] = result
+        if use_cache and job.name in keys and result.error is None:
+            manifest.record(job.output, keys[job.name], job.name, result.seconds)
+    if use_cache and rendered:
+        manifest.save()
+    return [results[job.name] for job in jobs]
+
+def print_job_report(results: Sequence[JobResult], wall_seconds: Optional[float] = None):
+    """Print the render time of every figure, slowest first, and any failures."""
+    print("\n=== Figure render times ===")
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        status = 'FAILED' if result.error else 'unchanged' if result.skipped else 'ok'
+        print(f"{result.name:<40} {result.seconds:8.2f} s  {status}")
+    total = sum(result.seconds for result in results)
+    skipped = sum(result.skipped for result in results)
+    summary = f"{len(results) - skipped} figures rendered, {skipped} unchanged, {total:.2f} s render time"
+    if wall_seconds is not None:
+        summary += f", {wall_seconds:.2f} s wall clock"
+    print(summary)
+    for result in results:
+        if result.error:
+            print(f"\n--- {result.name} ---\n{result.error}")
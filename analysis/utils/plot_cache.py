@@ -0,0 +1,153 @@
+"""Content-hash keys and a manifest for skipping figures whose inputs did not change.
+
+A figure's key hashes its output path, the source of its plotting function (and of the
+analysis functions and classes it references), the module-level data those functions
+read (e.g. the default material registry), its arguments and the rcParams produced by
+`setup_plot_style`. The manifest in the plots directory records the key each figure
+was last rendered with.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import types
+from typing import Dict, Optional
+
+import matplotlib
+import numpy as np
+
+from .lazy import LazyModule
+from .plotting import plots_dir, setup_plot_style
+
+MANIFEST_NAME = 'manifest.json'
+
+# Only code from this package is followed when collecting sources
+_PACKAGE = __name__.split('.')[0]
+
+_DATA_TYPES = (bool, int, float, complex, str, bytes, tuple, list, dict, frozenset, np.ndarray, np.generic)
+
+def _update(h, value, classes=None):
+    """Feed a stable representation of `value` into the hash, collecting object classes."""
+    if isinstance(value, np.ndarray):
+        h.update(f'ndarray:{value.dtype.str}:{value.shape}:'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        h.update(f'{type(value).__name__}:{value!r};'.encode())
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}[{len(value)}'.encode())
+        for item in value:
+            _update(h, item, classes)
+        h.update(b']')
+    elif isinstance(value, dict):
+        h.update(f'dict[{len(value)}'.encode())
+        for key in sorted(value, key=repr):
+            _update(h, key, classes)
+            _update(h, value[key], classes)
+        h.update(b']')
+    elif callable(value) and hasattr(value, '__qualname__'):
+        h.update(f'callable:{getattr(value, "__module__", "")}.{value.__qualname__};'.encode())
+    elif hasattr(value, '__dict__'):
+        h.update(f'object:{type(value).__module__}.{type(value).__qualname__}'.encode())
+        if classes is not None:
+            classes.add(type(value))
+        _update(h, vars(value), classes)
+    else:
+        h.update(f'repr:{value!r};'.encode())
+
+def _referenced(code: types.CodeType):
+    """Global names used by a code object and the functions nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced(const)
+    return names
+
+def _is_data(value) -> bool:
+    """Module-level values a figure can read: plain data and instances of package classes."""
+    if isinstance(value, LazyModule) or inspect.isroutine(value) or inspect.isclass(value) \
+            or inspect.ismodule(value):
+        return False
+    return isinstance(value, _DATA_TYPES) or type(value).__module__.split('.')[0] == _PACKAGE
+
+def _collect_sources(obj, sources: Dict[str, str], data: Dict[str, object]):
+    name = f'{obj.__module__}.{obj.__qualname__}'
+    if name in sources:
+        return
+    sources[name] = inspect.getsource(obj)
+    if inspect.isclass(obj):
+        functions = [member for member in vars(obj).values() if inspect.isfunction(member)]
+    else:
+        functions = [obj]
+    for function in functions:
+        for global_name in _referenced(function.__code__):
+            if global_name not in function.__globals__:
+                continue
+            dependency = function.__globals__[global_name]
+            if inspect.isfunction(dependency) or inspect.isclass(dependency):
+                if dependency.__module__.split('.')[0] == _PACKAGE:
+                    _collect_sources(dependency, sources, data)
+            elif _is_data(dependency):
+                # Module constants and state such as the default material registry
+                data[f'{function.__module__}.{global_name}'] = dependency
+                if type(dependency).__module__.split('.')[0] == _PACKAGE:
+                    _collect_sources(type(dependency), sources, data)
+
+def source_fingerprint(func, classes=()) -> str:
+    """Hash of the source of `func` and `classes`, of the package code they reference and of
+    the module-level data that code reads."""
+    sources = {}
+    data = {}
+    _collect_sources(func, sources, data)
+    for cls in classes:
+        if cls.__module__.split('.')[0] == _PACKAGE:
+            _collect_sources(cls, sources, data)
+    h = hashlib.sha256()
+    _update(h, [sources, data])
+    return h.hexdigest()
+
+def style_fingerprint() -> str:
+    """Hash of the rcParams set by `setup_plot_style` (and the matplotlib version)."""
+    import matplotlib.pyplot as plt
+    with plt.rc_context():
+        setup_plot_style()
+        params = {key: repr(value) for key, value in plt.rcParams.items() if key != 'backend'}
+    h = hashlib.sha256()
+    _update(h, [matplotlib.__version__, params])
+    return h.hexdigest()
+
+def job_key(job, style: Optional[str] = None) -> str:
+    """Content hash that changes whenever the figure rendered by `job` may change."""
+    h = hashlib.sha256()
+    classes = set()
+    _update(h, [job.output, job.args, job.kwargs], classes)
+    # Methods called on the arguments (e.g. RecyclingScenario) are part of the figure's code
+    _update(h, [source_fingerprint(job.func, sorted(classes, key=lambda c: c.__qualname__)),
+                style or style_fingerprint()])
+    return h.hexdigest()
+
+class PlotManifest:
+    """Output path -> key of the last successful render, stored as JSON in the plots directory."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(plots_dir(), MANIFEST_NAME)
+        self.figures = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.figures = json.load(f).get('figures', {})
+
+    def is_current(self, output: str, key: str) -> bool:
+        """True when `output` was rendered with `key` and the file still exists."""
+        entry = self.figures.get(output)
+        return (entry is not None and entry['key'] == key
+                and os.path.exists(os.path.join(plots_dir(), output)))
+
+    def record(self, output: str, key: str, job_name: str, seconds: float):
+        self.figures[output] = {'key': key, 'job': job_name, 'seconds': round(seconds, 3)}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'figures': self.figures}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -1,8 +1,27 @@
 """Common plotting utilities for the thermoplastic LCA analysis."""
 
-import matplotlib.pyplot as plt
+import os
+from pathlib import Path
+
 import numpy as np
 
+from .lazy import lazy_module
+
+plt = lazy_module('matplotlib.pyplot')
+
+# Generated figures go under results/plots; LCA_PLOTS_DIR overrides the location
+PLOTS_DIR = Path(__file__).resolve().parents[2] / 'results' / 'plots'
+
+def plots_dir():
+    """Root directory of the generated figures."""
+    return Path(os.environ.get('LCA_PLOTS_DIR', PLOTS_DIR))
+
+def plot_path(subdir, filename):
+    """Output path for a figure under the plots directory, creating the folder if needed."""
+    directory = plots_dir() / subdir
+    directory.mkdir(parents=True, exist_ok=True)
+    return str(directory / filename)
+
 def setup_plot_style():
     """Set up the common plot style."""
     plt.style.use('default')
@@ -29,3 +48,18 @@ def save_plot(fig, filename, dpi=300):
                 facecolor='white',
                 edgecolor='none')
     plt.close()
+
+def tornado_plot(ax, labels, low, high, center=0.0, low_color='#2ecc71', high_color='#ff7f0e'):
+    """Draw horizontal bars from `center` to the low and high values, widest range on top."""
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    labels = np.asarray(labels)
+    order = np.argsort(np.abs(high - low))
+    y = np.arange(len(order))
+    ax.barh(y, low[order] - center, left=center, color=low_color, label='Low bound')
+    ax.barh(y, high[order] - center, left=center, color=high_color, label='High bound')
+    ax.axvline(center, color='#000000', linewidth=1)
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels[order])
+    setup_grid(ax, axis='x')
+    ax.legend(loc='lower right', fontsize=10)
@@ -3,7 +3,8 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from ..scenarios.recycling import RecyclingScenario
-from ..utils.plotting import setup_plot_style, add_value_labels, setup_grid, save_plot
+from ..utils.jobs import PlotJob
+from ..utils.plotting import setup_plot_style, add_value_labels, setup_grid, save_plot, plot_path
 
 def create_co2_emissions_comparison():
     """Create a comparison plot of CO2 emissions for different scenarios."""
@@ -44,7 +45,7 @@ def create_co2_emissions_comparison():
     ax.legend(bbox_to_anchor=(1.02, 1), loc='upper left')
     
     plt.tight_layout(rect=[0, 0, 0.85, 0.95])
-    save_plot(fig, 'results/plots/emissions/co2_emissions_comparison.png')
+    save_plot(fig, plot_path('emissions', 'co2_emissions_comparison.png'))
 
 def create_co2_bar_comparison():
     """Create a bar plot comparison of CO2 emissions with logarithmic scale."""
@@ -86,7 +87,15 @@ def create_co2_bar_comparison():
     add_value_labels(ax, bars)
     
     plt.tight_layout()
-    save_plot(fig, 'results/plots/emissions/co2_bar_comparison.png')
+    save_plot(fig, plot_path('emissions', 'co2_bar_comparison.png'))
+
+def figure_jobs():
+    """Plot jobs for every figure of this module."""
+    return [
+        PlotJob('co2_emissions_comparison', create_co2_emissions_comparison,
+                output='emissions/co2_emissions_comparison.png'),
+        PlotJob('co2_bar_comparison', create_co2_bar_comparison, output='emissions/co2_bar_comparison.png')
+    ]
 
 if __name__ == "__main__":
     create_co2_emissions_comparison()
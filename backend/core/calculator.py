@@ -1,6 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import Material, Process, GridMix
-from typing import Dict, List
+from backend.core.metrics import span
+from backend.core.models import Material, Process, GridMix
+from backend.core.reference_data import ReferenceDataCache, reference_cache
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -9,34 +13,131 @@ class ManufacturingScenario:
     process_name: str
     grid_mix_name: str
     mass_kg: float
+    # Transport of the material to the site, e.g. from backend.core.transport for a material flow
+    transport_emissions_kg_co2e: float = 0.0
+
+class MissingComponentsError(ValueError):
+    """Raised when scenarios reference materials, processes or grid mixes that are not in the database.
+
+    `missing` maps each scenario index to the list of (component, name) pairs that could not be found.
+    """
+
+    def __init__(self, missing: Dict[int, List[tuple]]):
+        self.missing = missing
+        details = "; ".join(
+            f"scenario {index}: " + ", ".join(f"{component} '{name}'" for component, name in names)
+            for index, names in missing.items()
+        )
+        super().__init__(f"One or more components not found in database ({details})")
 
 class EmissionsCalculator:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, cache: Optional[ReferenceDataCache] = reference_cache):
         self.session = db_session
+        # Pass cache=None to always read reference data from the session
+        self.cache = cache
 
     def calculate_scenario_emissions(self, scenario: ManufacturingScenario) -> Dict:
         """Calculate total emissions for a given manufacturing scenario."""
-        # Get required data from database
-        material = self.session.query(Material).filter(Material.name == scenario.material_name).first()
-        process = self.session.query(Process).filter(Process.name == scenario.process_name).first()
-        grid_mix = self.session.query(GridMix).filter(GridMix.name == scenario.grid_mix_name).first()
+        with span("calculate"):
+            # Get required data from the cache or the database
+            material = self._get_by_name(Material, scenario.material_name)
+            process = self._get_by_name(Process, scenario.process_name)
+            grid_mix = self._get_by_name(GridMix, scenario.grid_mix_name)
+
+            if not all([material, process, grid_mix]):
+                raise ValueError("One or more components not found in database")
+
+            with span("emissions_math"):
+                return self._calculate(scenario, material, process, grid_mix)
+
+    def compare_scenarios(self, scenarios: List[ManufacturingScenario]) -> List[Dict]:
+        """Compare multiple manufacturing scenarios.
+
+        Reference data is loaded with one query per table for the whole batch instead of
+        three queries per scenario.
+        """
+        with span("compare_scenarios"):
+            materials = self._load_by_name(Material, {s.material_name for s in scenarios})
+            processes = self._load_by_name(Process, {s.process_name for s in scenarios})
+            grid_mixes = self._load_by_name(GridMix, {s.grid_mix_name for s in scenarios})
+            with span("emissions_math"):
+                return self._calculate_all(scenarios, materials, processes, grid_mixes)
+
+    @classmethod
+    def _calculate_all(cls, scenarios, materials: Dict, processes: Dict, grid_mixes: Dict) -> List[Dict]:
+        """Evaluate scenarios against name -> row maps, reporting every missing name at once."""
+        missing = {}
+        for index, scenario in enumerate(scenarios):
+            names = []
+            if scenario.material_name not in materials:
+                names.append(("material", scenario.material_name))
+            if scenario.process_name not in processes:
+                names.append(("process", scenario.process_name))
+            if scenario.grid_mix_name not in grid_mixes:
+                names.append(("grid mix", scenario.grid_mix_name))
+            if names:
+                missing[index] = names
+        if missing:
+            raise MissingComponentsError(missing)
+
+        return [
+            cls._calculate(
+                scenario,
+                materials[scenario.material_name],
+                processes[scenario.process_name],
+                grid_mixes[scenario.grid_mix_name]
+            )
+            for scenario in scenarios
+        ]
+
+    def _get_by_name(self, model, name: str):
+        """Fetch a single row by name, consulting the reference cache first."""
+        if self.cache is not None:
+            row = self.cache.get(model, "name", name)
+            if row is not None:
+                return row
+        with span(f"db.{model.__tablename__}"):
+            row = self.session.query(model).filter(model.name == name).order_by(model.id).first()
+        if row is not None and self.cache is not None:
+            row = self.cache.put(model, row)
+        return row
+
+    def _load_by_name(self, model, names) -> Dict:
+        """Fetch all rows of `model` whose name is in `names`.
 
-        if not all([material, process, grid_mix]):
-            raise ValueError("One or more components not found in database")
+        Names found in the reference cache are served from it; the rest are loaded with a
+        single IN query and added to the cache.
+        """
+        by_name = self.cache.get_many(model, names) if self.cache is not None else {}
+        pending = [name for name in names if name not in by_name]
+        if not pending:
+            return by_name
+        with span(f"db.{model.__tablename__}"):
+            rows = self.session.query(model).filter(model.name.in_(pending)).order_by(model.id).all()
+        # Process and grid mix names are not unique; keep the first row like `.first()` does
+        for row in rows:
+            if row.name not in by_name:
+                by_name[row.name] = self.cache.put(model, row) if self.cache is not None else row
+        return by_name
 
-        # Calculate emissions
+    @staticmethod
+    def _calculate(scenario: ManufacturingScenario, material, process, grid_mix) -> Dict:
+        """Calculate emissions for a scenario from already loaded reference data."""
         material_emissions = material.production_emissions * scenario.mass_kg
         process_energy = process.energy_consumption * scenario.mass_kg
         process_emissions = (process_energy * grid_mix.emissions_factor) + \
                           (process.emissions_factor * scenario.mass_kg if process.emissions_factor else 0)
-        
-        total_emissions = material_emissions + process_emissions
+
+        transport_emissions = scenario.transport_emissions_kg_co2e
+
+        total_emissions = material_emissions + process_emissions + transport_emissions
 
         return {
             "total_emissions_kg_co2e": total_emissions,
             "breakdown": {
                 "material_production_emissions": material_emissions,
                 "process_emissions": process_emissions,
+                "transport_emissions": transport_emissions,
                 "grid_mix_emissions_factor": grid_mix.emissions_factor,
                 "process_energy_consumption_kwh": process_energy
             },
@@ -49,10 +150,58 @@ class EmissionsCalculator:
             }
         }
 
-    def compare_scenarios(self, scenarios: List[ManufacturingScenario]) -> List[Dict]:
-        """Compare multiple manufacturing scenarios."""
-        results = []
-        for scenario in scenarios:
-            result = self.calculate_scenario_emissions(scenario)
-            results.append(result)
-        return results
+class AsyncEmissionsCalculator:
+    """Async variant of EmissionsCalculator for use with an AsyncSession."""
+
+    def __init__(self, db_session: AsyncSession, cache: Optional[ReferenceDataCache] = reference_cache):
+        self.session = db_session
+        # Pass cache=None to always read reference data from the session
+        self.cache = cache
+
+    async def calculate_scenario_emissions(self, scenario: ManufacturingScenario) -> Dict:
+        """Calculate total emissions for a given manufacturing scenario."""
+        with span("calculate"):
+            material = await self._get_by_name(Material, scenario.material_name)
+            process = await self._get_by_name(Process, scenario.process_name)
+            grid_mix = await self._get_by_name(GridMix, scenario.grid_mix_name)
+
+            if not all([material, process, grid_mix]):
+                raise ValueError("One or more components not found in database")
+
+            with span("emissions_math"):
+                return EmissionsCalculator._calculate(scenario, material, process, grid_mix)
+
+    async def compare_scenarios(self, scenarios: List[ManufacturingScenario]) -> List[Dict]:
+        """Compare multiple manufacturing scenarios with one query per table for the whole batch."""
+        with span("compare_scenarios"):
+            materials = await self._load_by_name(Material, {s.material_name for s in scenarios})
+            processes = await self._load_by_name(Process, {s.process_name for s in scenarios})
+            grid_mixes = await self._load_by_name(GridMix, {s.grid_mix_name for s in scenarios})
+            with span("emissions_math"):
+                return EmissionsCalculator._calculate_all(scenarios, materials, processes, grid_mixes)
+
+    async def _get_by_name(self, model, name: str):
+        """Fetch a single row by name, consulting the reference cache first."""
+        if self.cache is not None:
+            row = self.cache.get(model, "name", name)
+            if row is not None:
+                return row
+        with span(f"db.{model.__tablename__}"):
+            result = await self.session.execute(select(model).where(model.name == name).order_by(model.id).limit(1))
+        row = result.scalars().first()
+        if row is not None and self.cache is not None:
+            row = self.cache.put(model, row)
+        return row
+
+    async def _load_by_name(self, model, names) -> Dict:
+        """Fetch all rows of `model` whose name is in `names`, using the cache and one IN query."""
+        by_name = self.cache.get_many(model, names) if self.cache is not None else {}
+        pending = [name for name in names if name not in by_name]
+        if not pending:
+            return by_name
+        with span(f"db.{model.__tablename__}"):
+            result = await self.session.execute(select(model).where(model.name.in_(pending)).order_by(model.id))
+        for row in result.scalars():
+            if row.name not in by_name:
+                by_name[row.name] = self.cache.put(model, row) if self.cache is not None else row
+        return by_name
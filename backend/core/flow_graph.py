@@ -0,0 +1,216 @@
+"""Directed material flow network built from the flow tracking records.
+
+Every record sends `volume_kg_month` of one material along source_org -> destination ->
+processor (empty hops are skipped). The graph keeps the aggregates the app needs (volume
+per edge and material, node inflow/outflow, processor throughput) plus adjacency sets for
+reachability, and updates them in place as records arrive, so it is never rebuilt;
+`sync_flow_graph` adds the flows saved to the database since the last sync, including
+flows committed after ones with higher ids (see `backend.core.watermark`).
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.core.models import MaterialFlow
+from backend.core.watermark import IdWatermark
+
+# Record columns the graph reads
+FLOW_COLUMNS = ('source_org', 'source_type', 'material_type', 'volume_kg_month', 'destination', 'processor')
+
+def _name(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _names(series: pd.Series) -> pd.Series:
+    """`_name` for a whole column."""
+    text = series.astype('string').str.strip()
+    return text.where(text.notna() & (text != ''), None).astype(object)
+
+def record_hops(source, destination, processor) -> List[Tuple[str, str]]:
+    """Edges of one record: source -> destination -> processor, skipping empty and repeated nodes."""
+    path = []
+    for node in (_name(source), _name(destination), _name(processor)):
+        if node is not None and (not path or path[-1] != node):
+            path.append(node)
+    return list(zip(path, path[1:]))
+
+class FlowGraph:
+    """Aggregated flow network; `add` and `add_frame` update it incrementally."""
+
+    def __init__(self):
+        # (source, target, material) -> kg/month
+        self.edge_volume: Dict[Tuple[str, str, str], float] = defaultdict(float)
+        # (source, target) -> kg/month over all materials
+        self.edge_total: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.successors: Dict[str, Set[str]] = defaultdict(set)
+        self.predecessors: Dict[str, Set[str]] = defaultdict(set)
+        self.inflow: Dict[str, float] = defaultdict(float)
+        self.outflow: Dict[str, float] = defaultdict(float)
+        # (processor, material) -> kg/month arriving at the processor
+        self.throughput_by_material: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.source_types: Dict[str, str] = {}
+        self.record_count = 0
+        # Database ids added by sync_flow_graph, so it fetches every flow exactly once
+        self.watermark = IdWatermark()
+        self.lock = threading.RLock()
+
+    def _add_edge(self, source, target, material, volume):
+        self.edge_volume[(source, target, material)] += volume
+        self.edge_total[(source, target)] += volume
+        self.successors[source].add(target)
+        self.predecessors[target].add(source)
+        self.outflow[source] += volume
+        self.inflow[target] += volume
+
+    def add(self, record: Dict):
+        """Add one flow record (dict with FLOW_COLUMNS)."""
+        material = _name(record.get('material_type')) or 'Unknown'
+        volume = float(record.get('volume_kg_month') or 0.0)
+        with self.lock:
+            for source, target in record_hops(record.get('source_org'), record.get('destination'),
+                                              record.get('processor')):
+                self._add_edge(source, target, material, volume)
+            processor = _name(record.get('processor'))
+            if processor is not None:
+                self.throughput_by_material[(processor, material)] += volume
+            source, source_type = _name(record.get('source_org')), _name(record.get('source_type'))
+            if source is not None and source_type is not None:
+                self.source_types.setdefault(source, source_type)
+            self.record_count += 1
+
+    def add_frame(self, data: pd.DataFrame):
+        """Add many records at once; volumes are summed per edge before touching the graph."""
+        if data.empty:
+            return
+        data = pd.DataFrame({
+            column: _names(data[column]) if column != 'volume_kg_month' else data[column]
+            for column in FLOW_COLUMNS
+        })
+        data['material_type'] = data['material_type'].fillna('Unknown')
+        data['volume_kg_month'] = pd.to_numeric(data['volume_kg_month'], errors='coerce').fillna(0.0)
+
+        # Same hops as record_hops: drop nodes repeating the previous one, then link neighbours
+        first, second, third = data['source_org'], data['destination'], data['processor']
+        second = second.where(second != first)
+        third = third.where(third != second.where(second.notna(), first))
+        candidates = [(first, second, first.notna() & second.notna()),
+                      (second, third, second.notna() & third.notna()),
+                      (first, third, first.notna() & second.isna() & third.notna())]
+        hops = pd.concat([
+            pd.DataFrame({'source': source[mask], 'target': target[mask],
+                          'material': data['material_type'][mask], 'volume': data['volume_kg_month'][mask]})
+            for source, target, mask in candidates
+        ])
+        edges = hops.groupby(['source', 'target', 'material'], sort=False)['volume'].sum()
+
+        processors = data[data['processor'].notna()]
+        throughput = processors.groupby(['processor', 'material_type'], sort=False)['volume_kg_month'].sum()
+        sources = data[data['source_org'].notna() & data['source_type'].notna()]
+        source_types = sources.drop_duplicates('source_org').set_index('source_org')['source_type']
+
+        with self.lock:
+            for (source, target, material), volume in edges.items():
+                self._add_edge(source, target, material, float(volume))
+            for key, volume in throughput.items():
+                self.throughput_by_material[key] += float(volume)
+            for source, source_type in source_types.items():
+                self.source_types.setdefault(source, source_type)
+            self.record_count += len(data)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "FlowGraph":
+        graph = cls()
+        graph.add_frame(data)
+        return graph
+
+    @property
+    def nodes(self) -> List[str]:
+        with self.lock:
+            return sorted(set(self.inflow) | set(self.outflow))
+
+    def edges(self, material: Optional[str] = None) -> Dict[Tuple[str, str], float]:
+        """Volume per (source, target), for one material or summed over all of them."""
+        with self.lock:
+            if material is None:
+                return dict(self.edge_total)
+            totals = defaultdict(float)
+            for (source, target, edge_material), volume in self.edge_volume.items():
+                if edge_material == material:
+                    totals[(source, target)] += volume
+        return dict(totals)
+
+    def materials(self) -> List[str]:
+        with self.lock:
+            return sorted({material for _, _, material in self.edge_volume})
+
+    def throughput(self, processor: Optional[str] = None) -> Dict[str, float]:
+        """Volume arriving at each processor (or at `processor` only), per material."""
+        totals = defaultdict(float)
+        with self.lock:
+            for (name, material), volume in self.throughput_by_material.items():
+                if processor is None or name == processor:
+                    totals[name if processor is None else material] += volume
+        return dict(totals)
+
+    def _reachable(self, start: str, adjacency: Dict[str, Set[str]]) -> Set[str]:
+        seen, queue = set(), deque([start])
+        with self.lock:
+            while queue:
+                for neighbour in adjacency.get(queue.popleft(), ()):
+                    if neighbour not in seen and neighbour != start:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+        return seen
+
+    def downstream(self, node: str) -> Set[str]:
+        """Every node material from `node` can reach."""
+        return self._reachable(node, self.successors)
+
+    def upstream(self, node: str) -> Set[str]:
+        """Every node whose material can reach `node`."""
+        return self._reachable(node, self.predecessors)
+
+    def sankey(self, material: Optional[str] = None, max_edges: Optional[int] = None,
+               nodes: Optional[Iterable[str]] = None) -> Dict[str, list]:
+        """Sankey input: node labels and parallel source/target/value lists (indices into labels).
+
+        `max_edges` keeps only the largest edges; `nodes` restricts to edges between those nodes.
+        """
+        edges = self.edges(material)
+        if nodes is not None:
+            keep = set(nodes)
+            edges = {edge: volume for edge, volume in edges.items() if edge[0] in keep and edge[1] in keep}
+        ranked = sorted(edges.items(), key=lambda item: item[1], reverse=True)[:max_edges]
+        labels = sorted({node for (source, target), _ in ranked for node in (source, target)})
+        index = {label: i for i, label in enumerate(labels)}
+        return {
+            'labels': labels,
+            'source': [index[source] for (source, _), _ in ranked],
+            'target': [index[target] for (_, target), _ in ranked],
+            'value': [volume for _, volume in ranked]
+        }
+
+# Below this many new flows, adding them one by one beats building a DataFrame
+GRAPH_BULK_THRESHOLD = 256
+
+def sync_flow_graph(session: Session, graph: FlowGraph) -> int:
+    """Add the material flows saved since the graph was last synced; returns how many were added."""
+    columns = [MaterialFlow.id] + [getattr(MaterialFlow, column) for column in FLOW_COLUMNS]
+    with graph.lock:
+        rows = session.execute(
+            select(*columns).where(graph.watermark.condition(MaterialFlow.id)).order_by(MaterialFlow.id)
+        ).all()
+        if len(rows) < GRAPH_BULK_THRESHOLD:
+            for row in rows:
+                graph.add(row._asdict())
+        else:
+            graph.add_frame(pd.DataFrame(rows, columns=['id', *FLOW_COLUMNS]))
+        graph.watermark.advance([row.id for row in rows])
+    return len(rows)
@@ -0,0 +1,199 @@
+"""Timing spans, request traces and Prometheus-text metrics for the API and calculators.
+
+`span(name)` times a block. The duration always goes into the `lca_span_duration_seconds`
+histogram and, while a request trace is active (see `start_trace`), also into that
+request's trace, which the API can return as a Server-Timing header. SQL statements on any
+SQLAlchemy engine are counted and timed as `db.query` spans (see `instrument_queries`).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {value}')
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (bucket counts, sum, count)
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            entry = self._values.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        names = self.labelnames + ('le',)
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{_labels(names, labels + (f"{bound:g}",))} {bucket_count}')
+                lines.append(f'{self.name}_bucket{_labels(names, labels + ("+Inf",))} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {total}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+class CallbackMetric:
+    """Metric whose samples are read from `collect()` at scrape time: {label values: value}.
+
+    Used for values that are already counted elsewhere, e.g. cache statistics.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple, float]],
+                 type: str = 'gauge'):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.type = type
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, labels)} {value}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, labelnames, collect, type='gauge') -> CallbackMetric:
+        return self._register(CallbackMetric(name, help, labelnames, collect, type))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+span_duration = registry.histogram(
+    'lca_span_duration_seconds', 'Duration of timed spans (queries, calculations, serialization)', ('span',))
+db_queries = registry.counter('lca_db_queries_total', 'SQL statements executed')
+
+class Trace:
+    """Spans and query count collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+        self.query_count = 0
+
+    def summary(self) -> Dict[str, Tuple[float, int]]:
+        """Total seconds and number of occurrences per span name, in first-seen order."""
+        totals = {}
+        for name, seconds in self.spans:
+            total, count = totals.get(name, (0.0, 0))
+            totals[name] = (total + seconds, count + 1)
+        return totals
+
+    def server_timing(self) -> str:
+        """Span breakdown as a Server-Timing header value (durations in milliseconds)."""
+        entries = [
+            f'{name};dur={total * 1000:.3f};desc="{count}x"'
+            for name, (total, count) in self.summary().items()
+        ]
+        entries.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.3f}')
+        return ', '.join(entries)
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+def start_trace() -> Tuple[Trace, object]:
+    """Start collecting spans for the current request; pass the token to `current_trace.reset`."""
+    trace = Trace()
+    return trace, current_trace.set(trace)
+
+def record_span(name: str, seconds: float):
+    span_duration.observe(seconds, name)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.spans.append((name, seconds))
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block as span `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+def instrument_queries():
+    """Count and time every SQL statement on every engine (sync and async) as `db.query` spans."""
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        record_span("db.query", time.perf_counter() - conn.info["query_start"].pop())
+        db_queries.inc()
+        trace = current_trace.get()
+        if trace is not None:
+            trace.query_count += 1
+
+    @event.listens_for(Engine, "handle_error")
+    def _failed_query(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+instrument_queries()
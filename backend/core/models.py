@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, JSON, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
 import enum
 
@@ -42,3 +42,57 @@ class GridMix(Base):
     name = Column(String, nullable=False)
     emissions_factor = Column(Float)  # kg CO2e/kWh
     country_code = Column(String(2))  # Two-letter country code
+
+class Interview(Base):
+    """Stakeholder interview recorded in the EOL flow tracking app."""
+    __tablename__ = "interviews"
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    name = Column(String)
+    role = Column(String)  # Stakeholder category
+    org = Column(String, index=True)
+    location = Column(String, index=True)
+    material_types = Column(String, index=True)
+    collection_method = Column(String, index=True)
+    volume = Column(Float)  # kg/month
+    transportation = Column(String)
+    processing_tech = Column(String)
+    current_eol = Column(Text)
+    missing_eol = Column(Text)
+    value_chain_exp = Column(Text)
+    risk_financial = Column(Integer)  # 1 (lowest) to 8 (highest)
+    risk_technical = Column(Integer)
+    risk_operational = Column(Integer)
+    risk_regulatory = Column(Integer)
+    risk_market = Column(Integer)
+    risk_environmental = Column(Integer)
+    value_chain_type = Column(String)
+    responsibility = Column(String)
+    proximity = Column(Integer)  # 1 (very far) to 5 (very close)
+    material_trace = Column(String)
+    risks = Column(Text)
+    interest = Column(String)
+
+class MaterialFlow(Base):
+    """Material flow between organizations recorded in the EOL flow tracking app."""
+    __tablename__ = "material_flows"
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    source_org = Column(String, index=True)
+    source_type = Column(String)
+    material_type = Column(String, index=True)
+    volume_kg_month = Column(Float)
+    source_location = Column(String, index=True)
+    collection_method = Column(String, index=True)
+    transport_mode = Column(String)
+    destination = Column(String)
+    processor = Column(String)
+    notes = Column(Text)
+
+class FlowRollup(Base):
+    """Running material flow totals per value of a summary dimension, kept in step with material_flows."""
+    __tablename__ = "flow_rollups"
+    dimension = Column(String, primary_key=True)  # material_type, source_location, collection_method or month
+    key = Column(String, primary_key=True)  # '' when the record left the field empty
+    volume_kg_month = Column(Float, nullable=False, default=0.0)
+    flow_count = Column(Integer, nullable=False, default=0)
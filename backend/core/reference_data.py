@@ -0,0 +1,147 @@
+"""Process-wide cache for Material, Process and GridMix reference rows."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.core.models import Material, Process, GridMix
+
+REFERENCE_MODELS = (Material, Process, GridMix)
+
+# Upper bound on how long reference data changed by another process stays invisible here
+REFERENCE_CACHE_TTL_SECONDS = float(os.environ.get('REFERENCE_CACHE_TTL_SECONDS', 300))
+
+def snapshot(row) -> SimpleNamespace:
+    """Copy the column values of an ORM row so it can be shared safely across sessions and threads."""
+    return SimpleNamespace(**{column.key: getattr(row, column.key) for column in row.__table__.columns})
+
+class ReferenceDataCache:
+    """Thread-safe LRU cache with TTL for reference rows, keyed by name and by id.
+
+    Entries are stored as snapshots, never as live ORM objects, and each row takes two
+    slots of `max_size` (name and id). Call `invalidate` after writing to the reference
+    tables in this process; writes committed through an ORM session are picked up
+    automatically (see `track_reference_writes`). The cache is per process: writes by other
+    processes (`seed_data.py`, SQL, other API workers) show only after `ttl_seconds`.
+
+    `version` changes on every invalidation, so derived caches can drop their entries.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = REFERENCE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model, field: str, value):
+        return (model.__tablename__, field, value)
+
+    def get(self, model, field: str, value) -> Optional[SimpleNamespace]:
+        """Return the cached row for `model.<field> == value`, or None on a miss."""
+        key = self._key(model, field, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                row, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return row
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def get_many(self, model, names: Iterable[str]) -> Dict[str, SimpleNamespace]:
+        """Return the cached rows for the given names; names not in the cache are left out."""
+        found = {}
+        for name in names:
+            row = self.get(model, "name", name)
+            if row is not None:
+                found[name] = row
+        return found
+
+    def put(self, model, row) -> SimpleNamespace:
+        """Cache a row under both its name and its id and return the stored snapshot."""
+        if not isinstance(row, SimpleNamespace):
+            row = snapshot(row)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for field in ("name", "id"):
+                key = self._key(model, field, getattr(row, field))
+                self._entries[key] = (row, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return row
+
+    def invalidate(self, model=None, name: Optional[str] = None, id: Optional[int] = None):
+        """Drop cached rows.
+
+        Without arguments everything is dropped; with only `model` all rows of that table;
+        with `name` or `id` just that row.
+        """
+        with self._lock:
+            self.version += 1
+            if model is None:
+                self._entries.clear()
+                return
+            table = model.__tablename__
+            for key, (row, _) in list(self._entries.items()):
+                if key[0] != table:
+                    continue
+                if name is not None and row.name != name:
+                    continue
+                if id is not None and row.id != id:
+                    continue
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Shared instance used by EmissionsCalculator unless another cache is passed in
+reference_cache = ReferenceDataCache()
+
+def track_reference_writes(cache: ReferenceDataCache = reference_cache):
+    """Invalidate `cache` whenever a session commits changes to Material, Process or GridMix rows.
+
+    Only writes made through the ORM in this process are seen; bulk SQL or other processes
+    still need an explicit `invalidate`.
+    """
+    @event.listens_for(Session, "after_flush")
+    def _record_reference_writes(session, flush_context):
+        changed = session.info.setdefault("changed_reference_models", set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, REFERENCE_MODELS):
+                changed.add(type(obj))
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate_after_commit(session):
+        for model in session.info.pop("changed_reference_models", ()):
+            cache.invalidate(model)
+
+    @event.listens_for(Session, "after_rollback")
+    def _forget_after_rollback(session):
+        session.info.pop("changed_reference_models", None)
+
+track_reference_writes()
@@ -0,0 +1,118 @@
+"""Memoized emissions responses keyed on the normalized scenario, with ETags."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from backend.core.reference_data import ReferenceDataCache, reference_cache
+
+def normalize_scenario(scenario) -> Tuple[str, str, str, float, float]:
+    """Reduce a ManufacturingScenario to the tuple that determines its result."""
+    return (
+        scenario.material_name.strip(),
+        scenario.process_name.strip(),
+        scenario.grid_mix_name.strip(),
+        float(scenario.mass_kg),
+        float(scenario.transport_emissions_kg_co2e)
+    )
+
+class ResponseCache:
+    """LRU cache of serialized emissions results bounded by a memory budget.
+
+    Entries are only valid for the reference-data version they were computed against; the
+    whole cache is dropped as soon as `reference.version` moves on. That only catches writes
+    made in this process, so entries also expire after the reference cache's TTL, which bounds
+    how long changes by other processes (seeding, SQL, other workers) can go unnoticed.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, reference: ReferenceDataCache = reference_cache,
+                 ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.reference = reference
+        self.ttl_seconds = reference.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        # key -> (body, etag, expires_at)
+        self._entries = OrderedDict()
+        self._version = reference.version
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        """Strong ETag of a response body; equal bodies get equal tags in every process."""
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def _check_version(self):
+        # Called with the lock held
+        if self._version != self.reference.version:
+            self._entries.clear()
+            self.size_bytes = 0
+            self._version = self.reference.version
+
+    def _remove(self, key: Tuple):
+        # Called with the lock held
+        body, _, _ = self._entries.pop(key)
+        self.size_bytes -= len(body)
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, str]]:
+        """Return the cached (JSON body, ETag) for `key`, or None on a miss."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: Tuple, result: Dict, version: Optional[int] = None) -> Tuple[bytes, str]:
+        """Serialize and cache `result`, evicting least recently used entries over the budget.
+
+        Returns the body and its ETag. `version` is the reference-data version the result was
+        computed against; results that were overtaken by an invalidation while computing are
+        returned but not cached.
+        """
+        body = json.dumps(result).encode()
+        etag = self.etag(body)
+        with self._lock:
+            self._check_version()
+            if version is not None and version != self._version:
+                return body, etag
+            if len(body) > self.max_bytes:
+                return body, etag
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, etag, time.monotonic() + self.ttl_seconds)
+            self.size_bytes += len(body)
+            while self.size_bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.evictions += 1
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,177 @@
+"""Weighted composite risk scores for stakeholder interviews, and a ranking index over them.
+
+Every answer is mapped to a 0 (low risk) - 1 (high risk) component: the six risk sliders,
+proximity to the responsible party (far is risky), material traceability, value chain type
+and willingness to collaborate. The composite score is the weighted mean of the components
+an interview has, scaled to 0-100, computed for all interviews at once as array operations.
+
+`RiskIndex` keeps the scored interviews in score order overall and per stakeholder category
+and per location, so top-k queries read the first k entries instead of sorting. New
+interviews are scored and inserted as they arrive (`sync_risk_index` fetches those saved
+since the last sync, including ones committed after interviews with higher ids); other
+weights need a new index.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.core.models import Interview
+from backend.core.watermark import IdWatermark
+
+RISK_COLUMNS = ('risk_financial', 'risk_technical', 'risk_operational',
+                'risk_regulatory', 'risk_market', 'risk_environmental')
+
+# Answer -> risk component; answers not listed (e.g. empty) count as missing
+TRACEABILITY_RISK = {'Fully Traceable': 0.0, 'Partially Traceable': 1 / 3,
+                     'Limited Traceability': 2 / 3, 'Not Traceable': 1.0}
+VALUE_CHAIN_RISK = {'Closed Loop': 0.0, 'Hybrid/Mixed': 0.5, 'Open Loop': 1.0, 'Not Determined': 1.0}
+INTEREST_RISK = {'Yes': 0.0, 'Maybe': 0.5, 'No': 1.0}
+
+# Interview columns the scores and the index read
+SCORE_INPUTS = (*RISK_COLUMNS, 'proximity', 'material_trace', 'value_chain_type', 'interest')
+INDEX_COLUMNS = ('id', 'name', 'org', 'role', 'location')
+
+@dataclass(frozen=True)
+class RiskWeights:
+    """Relative weight of each component in the composite score (0 leaves it out)."""
+    risk_financial: float = 1.0
+    risk_technical: float = 1.0
+    risk_operational: float = 1.0
+    risk_regulatory: float = 1.0
+    risk_market: float = 1.0
+    risk_environmental: float = 1.0
+    proximity: float = 1.0
+    material_trace: float = 1.0
+    value_chain_type: float = 0.5
+    interest: float = 1.0
+
+    def vector(self) -> np.ndarray:
+        weights = np.array([getattr(self, name) for name in SCORE_INPUTS], dtype=float)
+        if (weights < 0).any() or weights.sum() == 0:
+            raise ValueError('Risk weights must be non-negative and not all zero')
+        return weights
+
+def _mapped(values: pd.Series, mapping: Dict[str, float]) -> np.ndarray:
+    return values.astype('string').str.strip().map(mapping).astype(float).to_numpy()
+
+def components(data: pd.DataFrame) -> np.ndarray:
+    """(n interviews x len(SCORE_INPUTS)) matrix of 0-1 risk components, NaN where unanswered."""
+    n = len(data)
+    missing = pd.Series(np.nan, index=data.index)
+    columns = [
+        (pd.to_numeric(data.get(column, missing), errors='coerce').to_numpy(dtype=float) - 1) / 7
+        for column in RISK_COLUMNS
+    ]
+    columns.append((5 - pd.to_numeric(data.get('proximity', missing), errors='coerce').to_numpy(dtype=float)) / 4)
+    for column, mapping in (('material_trace', TRACEABILITY_RISK), ('value_chain_type', VALUE_CHAIN_RISK),
+                            ('interest', INTEREST_RISK)):
+        columns.append(_mapped(data[column], mapping) if column in data else np.full(n, np.nan))
+    return np.clip(np.column_stack(columns), 0.0, 1.0) if n else np.empty((0, len(SCORE_INPUTS)))
+
+def composite_scores(data: pd.DataFrame, weights: RiskWeights = RiskWeights()) -> np.ndarray:
+    """0-100 composite risk per interview; NaN for interviews without any weighted answer."""
+    values = components(data)
+    w = weights.vector()
+    answered = ~np.isnan(values)
+    total_weight = answered @ w
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * np.where(answered, values, 0.0) @ w / np.where(total_weight > 0, total_weight, np.nan)
+
+def _group(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    value = str(value).strip()
+    return value.casefold() if value else None
+
+class RiskIndex:
+    """Scored interviews, ordered by score overall and per category (`role`) and location."""
+
+    def __init__(self, weights: RiskWeights = RiskWeights()):
+        self.weights = weights
+        self.rows: Dict[int, dict] = {}
+        # Sorted (-score, id) entries, highest risk first
+        self._order: List[Tuple[float, int]] = []
+        self._by_group: Dict[Tuple[str, str], List[Tuple[float, int]]] = defaultdict(list)
+        # (dimension, group) -> spelling of the first interview in that group
+        self._labels: Dict[Tuple[str, str], str] = {}
+        # Database ids added by sync_risk_index, so it fetches every interview exactly once
+        self.watermark = IdWatermark()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_frame(self, data: pd.DataFrame):
+        """Score new interviews (with an `id` column) and insert them into the index."""
+        if data.empty:
+            return
+        scores = composite_scores(data, self.weights)
+        keep = ~np.isnan(scores)
+        rows = data.loc[keep, [column for column in INDEX_COLUMNS if column in data]].assign(score=scores[keep])
+        records = rows.to_dict('records')
+        new_entries = defaultdict(list)
+        with self.lock:
+            for row in records:
+                entry = (-row['score'], int(row['id']))
+                self.rows[entry[1]] = row
+                new_entries[None].append(entry)
+                for dimension in ('role', 'location'):
+                    key = _group(row.get(dimension))
+                    if key is not None:
+                        new_entries[(dimension, key)].append(entry)
+                        self._labels.setdefault((dimension, key), str(row[dimension]).strip())
+            for key, entries in new_entries.items():
+                target = self._order if key is None else self._by_group[key]
+                if len(entries) <= 64:
+                    for entry in entries:
+                        bisect.insort(target, entry)
+                else:
+                    # Timsort merges the sorted list and the sorted new run in linear time
+                    target.extend(sorted(entries))
+                    target.sort()
+
+    def top(self, k: int = 10, role: Optional[str] = None, location: Optional[str] = None,
+            lowest: bool = False) -> pd.DataFrame:
+        """The k highest-risk interviews (lowest-risk with `lowest`), optionally of one category/location."""
+        with self.lock:
+            groups = [self._by_group.get((dimension, _group(value)), [])
+                      for dimension, value in (('role', role), ('location', location)) if value is not None]
+            # Walk the smallest matching list and check the other filter on the way
+            entries = min(groups, key=len) if groups else self._order
+            ordered = reversed(entries) if lowest else iter(entries)
+            selected = []
+            for _, interview_id in ordered:
+                row = self.rows[interview_id]
+                if (role is None or _group(row.get('role')) == _group(role)) and \
+                        (location is None or _group(row.get('location')) == _group(location)):
+                    selected.append(row)
+                    if len(selected) == k:
+                        break
+        result = pd.DataFrame(selected, columns=[*INDEX_COLUMNS, 'score'])
+        result.insert(0, 'rank', range(1, len(result) + 1))
+        return result
+
+    def groups(self, dimension: str) -> List[str]:
+        """Distinct categories ('role') or locations with at least one scored interview."""
+        with self.lock:
+            return sorted(label for (group_dimension, _), label in self._labels.items() if group_dimension == dimension)
+
+def sync_risk_index(session: Session, index: RiskIndex) -> int:
+    """Score and index the interviews saved since the index was last synced; returns how many."""
+    names = list(dict.fromkeys((*INDEX_COLUMNS, *SCORE_INPUTS)))
+    with index.lock:
+        rows = session.execute(
+            select(*[getattr(Interview, name) for name in names])
+            .where(index.watermark.condition(Interview.id)).order_by(Interview.id)
+        ).all()
+        index.add_frame(pd.DataFrame(rows, columns=names))
+        index.watermark.advance([row.id for row in rows])
+    return len(rows)
@@ -0,0 +1,214 @@
+"""Transport emissions of material flows: distance from a local gazetteer times per-mode factors.
+
+Locations are looked up by name in a gazetteer CSV (name, country, latitude, longitude);
+the great-circle distance matrix between all gazetteer entries is computed once per file
+version and cached. Every flow is encoded once into (origin, destination, mode, tonnes)
+arrays (`encode_flows`), so emissions for all flows, also after changing the factors, are
+one array expression:
+
+    kg CO2e/month = tonnes/month * distance km * circuity[mode] * kg CO2e per tonne-km[mode]
+
+`flow_scenarios` turns the flows and their transport emissions into ManufacturingScenarios
+per material, so EmissionsCalculator totals include transport.
+"""
+
+import os
+import re
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.core.calculator import ManufacturingScenario
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'EOL flow modelling', 'gazetteer.csv')
+
+EARTH_RADIUS_KM = 6371.0
+
+@dataclass(frozen=True)
+class TransportMode:
+    kg_co2e_per_tonne_km: float
+    # Route length / great-circle distance
+    circuity: float
+
+# Typical well-to-wheel averages for freight
+TRANSPORT_MODES: Dict[str, TransportMode] = {
+    'truck': TransportMode(0.105, 1.2),
+    'van': TransportMode(0.58, 1.2),
+    'rail': TransportMode(0.028, 1.3),
+    'barge': TransportMode(0.031, 1.4),
+    'ship': TransportMode(0.016, 1.5),
+    'air': TransportMode(0.60, 1.05)
+}
+
+# Spellings used in the flow records -> TRANSPORT_MODES key
+MODE_ALIASES = {
+    'lorry': 'truck', 'road': 'truck', 'hgv': 'truck', 'trucks': 'truck',
+    'train': 'rail', 'railway': 'rail',
+    'inland waterway': 'barge', 'inland ship': 'barge',
+    'sea': 'ship', 'vessel': 'ship', 'sea freight': 'ship',
+    'plane': 'air', 'air freight': 'air', 'airplane': 'air'
+}
+
+def _normalize(values: pd.Series) -> pd.Series:
+    return values.astype('string').str.strip().str.casefold()
+
+@dataclass
+class Gazetteer:
+    names: List[str]
+    latitude: np.ndarray
+    longitude: np.ndarray
+    index: Dict[str, int]
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "Gazetteer":
+        names = data['name'].astype(str).str.strip().tolist()
+        index = {}
+        for position, name in enumerate(names):
+            index.setdefault(name.casefold(), position)
+        return cls(names, data['latitude'].to_numpy(dtype=float), data['longitude'].to_numpy(dtype=float), index)
+
+    def codes(self, locations: pd.Series) -> np.ndarray:
+        """Gazetteer position of every location, -1 where unknown.
+
+        'Utrecht, NL' style names fall back to the part before the first comma.
+        """
+        # Flows repeat few locations, so each distinct spelling is resolved once
+        positions, distinct = pd.factorize(locations.astype('string'), use_na_sentinel=True)
+        normalized = _normalize(pd.Series(distinct))
+        codes = normalized.map(self.index)
+        fallback = normalized.str.split(',', n=1).str[0].str.strip().map(self.index)
+        # Missing locations (factorize code -1) pick the appended -1
+        resolved = np.append(codes.fillna(fallback).fillna(-1).to_numpy(dtype=np.intp), -1)
+        return resolved[positions]
+
+    def distance_matrix(self) -> np.ndarray:
+        """Great-circle distances (km) between all entries."""
+        lat, lon = np.radians(self.latitude), np.radians(self.longitude)
+        dlat = lat[:, None] - lat[None, :]
+        dlon = lon[:, None] - lon[None, :]
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+@lru_cache(maxsize=4)
+def _load(path: str, mtime_ns: int):
+    gazetteer = Gazetteer.from_frame(pd.read_csv(path))
+    return gazetteer, gazetteer.distance_matrix()
+
+def load_gazetteer(path: Optional[str] = None):
+    """(Gazetteer, distance matrix) for `path`; re-read only after the file changes."""
+    path = path or os.environ.get('GAZETTEER_PATH', GAZETTEER_PATH)
+    return _load(path, os.stat(path).st_mtime_ns)
+
+@dataclass
+class EncodedFlows:
+    """Flows as arrays; `mode_idx` indexes `modes`, -1 marks an unknown location or mode."""
+    origin_idx: np.ndarray
+    destination_idx: np.ndarray
+    mode_idx: np.ndarray
+    modes: List[str]
+    tonnes_month: np.ndarray
+    distance_km: np.ndarray
+
+    def __len__(self):
+        return len(self.tonnes_month)
+
+    def status(self) -> np.ndarray:
+        """'ok', 'unknown location' or 'unknown mode' per flow."""
+        return np.select(
+            [(self.origin_idx < 0) | (self.destination_idx < 0), self.mode_idx < 0],
+            ['unknown location', 'unknown mode'], 'ok')
+
+def encode_flows(data: pd.DataFrame, gazetteer: Optional[Gazetteer] = None,
+                 distances: Optional[np.ndarray] = None,
+                 modes: Optional[List[str]] = None) -> EncodedFlows:
+    """Resolve locations and modes of flow records (source_location, destination, transport_mode,
+    volume_kg_month) once, so emissions can be recomputed for any factors."""
+    if gazetteer is None:
+        gazetteer, distances = load_gazetteer()
+    elif distances is None:
+        distances = gazetteer.distance_matrix()
+    modes = list(modes or TRANSPORT_MODES)
+    positions, distinct = pd.factorize(data['transport_mode'].astype('string'), use_na_sentinel=True)
+    mode_names = _normalize(pd.Series(distinct)).replace(MODE_ALIASES)
+    mode_codes = mode_names.map({name: i for i, name in enumerate(modes)}).fillna(-1).to_numpy(dtype=np.intp)
+    # The appended -1 is what missing modes (factorize code -1) pick
+    mode_idx = np.append(mode_codes, -1)[positions]
+
+    origin = gazetteer.codes(data['source_location'])
+    destination = gazetteer.codes(data['destination'])
+    known = (origin >= 0) & (destination >= 0)
+    distance = np.where(known, distances[np.where(known, origin, 0), np.where(known, destination, 0)], np.nan)
+    tonnes = pd.to_numeric(data['volume_kg_month'], errors='coerce').fillna(0.0).to_numpy(dtype=float) / 1000
+    return EncodedFlows(origin, destination, mode_idx, modes, tonnes, distance)
+
+def transport_modes(values: Dict[str, Tuple]) -> Tuple[Dict[str, TransportMode], List[str]]:
+    """TransportModes from edited (kg CO2e per tonne-km, circuity) values per mode.
+
+    Modes with a missing, non-numeric or out-of-range value (factor < 0, circuity < 1) keep
+    their TRANSPORT_MODES default; those modes are returned as the second item.
+    """
+    modes, reset = dict(TRANSPORT_MODES), []
+    for mode, (per_tonne_km, circuity) in values.items():
+        per_tonne_km, circuity = pd.to_numeric(pd.Series([per_tonne_km, circuity]), errors='coerce')
+        if np.isnan(per_tonne_km) or np.isnan(circuity) or per_tonne_km < 0 or circuity < 1:
+            reset.append(mode)
+        else:
+            modes[mode] = TransportMode(float(per_tonne_km), float(circuity))
+    return modes, reset
+
+def transport_emissions(flows: EncodedFlows,
+                        transport_modes: Optional[Dict[str, TransportMode]] = None) -> np.ndarray:
+    """kg CO2e per month of every flow; NaN where the location or mode is unknown."""
+    transport_modes = transport_modes or TRANSPORT_MODES
+    per_tonne_km = np.array([transport_modes[mode].kg_co2e_per_tonne_km * transport_modes[mode].circuity
+                             for mode in flows.modes] + [np.nan])
+    # Index -1 (unknown mode) picks the trailing NaN
+    return flows.tonnes_month * flows.distance_km * per_tonne_km[flows.mode_idx]
+
+def with_transport(scenarios: List[ManufacturingScenario], emissions: np.ndarray) -> List[ManufacturingScenario]:
+    """Copies of ManufacturingScenarios carrying the transport emissions of their flows (NaN counts as 0),
+    so EmissionsCalculator totals include transport."""
+    return [replace(scenario, transport_emissions_kg_co2e=0.0 if np.isnan(value) else float(value))
+            for scenario, value in zip(scenarios, emissions)]
+
+_ABBREVIATION = re.compile(r'\(([^()]+)\)\s*$')
+
+def flow_scenarios(data: pd.DataFrame, emissions: np.ndarray, material_names: Sequence[str],
+                   process_name: str, grid_mix_name: str) -> Tuple[List[ManufacturingScenario], List[str]]:
+    """One ManufacturingScenario per material type of the flows: their total kg/month processed
+    with `process_name` on `grid_mix_name`, carrying their summed transport emissions.
+
+    Material types are matched to `material_names` (the materials table) by name or by the
+    abbreviation in parentheses, e.g. 'PEEK' -> 'Polyether Ether Ketone (PEEK)'. Returns the
+    scenarios and the material types without a match; flows without transport emissions
+    (unknown place or mode) count with their mass only.
+    """
+    index = {}
+    for name in material_names:
+        index.setdefault(name.strip().casefold(), name)
+        match = _ABBREVIATION.search(name)
+        if match:
+            index.setdefault(match.group(1).strip().casefold(), name)
+    totals = data.assign(
+        material=data['material_type'].astype('string').str.strip(),
+        volume=pd.to_numeric(data['volume_kg_month'], errors='coerce'),
+        transport=emissions
+    ).groupby('material')[['volume', 'transport']].sum()
+
+    scenarios, transport, unmatched = [], [], []
+    for material, volume, flow_transport in zip(totals.index, totals['volume'], totals['transport']):
+        name = index.get(material.casefold())
+        if name is None:
+            unmatched.append(material)
+        elif volume > 0:
+            scenarios.append(ManufacturingScenario(name, process_name, grid_mix_name, float(volume)))
+            transport.append(flow_transport)
+    return with_transport(scenarios, np.asarray(transport, dtype=float)), unmatched
+
+def flow_transport_table(data: pd.DataFrame, flows: EncodedFlows, emissions: np.ndarray) -> pd.DataFrame:
+    """Flow records with distance, emissions and lookup status, for display or export."""
+    return data.assign(distance_km=flows.distance_km, transport_kg_co2e_month=emissions, status=flows.status())
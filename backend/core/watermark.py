@@ -0,0 +1,80 @@
+"""Progress of an incremental sync over a table's integer ids.
+
+Ids are handed out before commit, so a row can become visible after rows with higher ids
+(a slow form save, one chunk of a large import). Fetching only `id > last_id` would skip
+such a row forever. `IdWatermark` therefore also remembers the ranges of ids below
+`last_id` that have not been seen yet and asks for them again on every sync, until the
+rows show up or the gap is older than SYNC_GAP_TIMEOUT_SECONDS (ids of rolled back
+transactions never show up).
+"""
+
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+
+# How long a missing id is waited for; longer than any transaction that saves records
+SYNC_GAP_TIMEOUT_SECONDS = float(os.environ.get('SYNC_GAP_TIMEOUT_SECONDS', 3600))
+# Most gap ranges asked for per sync; the oldest are dropped beyond this
+SYNC_MAX_GAPS = int(os.environ.get('SYNC_MAX_GAPS', 1000))
+
+class IdWatermark:
+    """Highest synced id plus the (first id, last id, noticed at) ranges below it still missing."""
+
+    def __init__(self, last_id: int = 0, gaps: Iterable[Tuple[int, int, float]] = ()):
+        self.last_id = int(last_id)
+        self.gaps: List[Tuple[int, int, float]] = [(int(low), int(high), float(noticed)) for low, high, noticed in gaps]
+
+    def condition(self, column):
+        """WHERE clause for the rows not synced yet."""
+        return or_(column > self.last_id, *[column.between(low, high) for low, high, _ in self.gaps])
+
+    def unseen(self, ids) -> np.ndarray:
+        """Boolean mask of the ids that have not been synced yet."""
+        ids = np.asarray(ids, dtype=np.int64)
+        mask = ids > self.last_id
+        for low, high, _ in self.gaps:
+            mask |= (ids >= low) & (ids <= high)
+        return mask
+
+    def advance(self, ids, now: Optional[float] = None):
+        """Record the ids of synced rows, opening gaps for the ids skipped below the new highest one."""
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        now = time.time() if now is None else now
+        if not len(ids):
+            self.expire(now)
+            return
+        ranges = list(self.gaps)
+        if ids[-1] > self.last_id:
+            ranges.append((self.last_id + 1, int(ids[-1]), now))
+            self.last_id = int(ids[-1])
+        gaps = []
+        for low, high, noticed in ranges:
+            inside = ids[np.searchsorted(ids, low):np.searchsorted(ids, high, side='right')]
+            # Runs of consecutive missing ids between the synced ones
+            bounds = np.concatenate([[low - 1], inside, [high + 1]])
+            starts = np.flatnonzero(np.diff(bounds) > 1)
+            gaps.extend((int(bounds[i] + 1), int(bounds[i + 1] - 1), noticed) for i in starts)
+        self.gaps = gaps
+        self.expire(now)
+
+    def expire(self, now: Optional[float] = None):
+        """Stop waiting for gaps older than SYNC_GAP_TIMEOUT_SECONDS and beyond SYNC_MAX_GAPS."""
+        now = time.time() if now is None else now
+        gaps = [gap for gap in self.gaps if now - gap[2] <= SYNC_GAP_TIMEOUT_SECONDS]
+        if len(gaps) > SYNC_MAX_GAPS:
+            gaps = sorted(gaps, key=lambda gap: gap[2])[-SYNC_MAX_GAPS:]
+        self.gaps = gaps
+
+    def to_state(self) -> Dict:
+        """JSON-serializable form, see `from_state`."""
+        return {'last_id': self.last_id, 'gaps': [list(gap) for gap in self.gaps]}
+
+    @classmethod
+    def from_state(cls, state) -> "IdWatermark":
+        """Inverse of `to_state`; a plain integer is read as a last id without gaps."""
+        if isinstance(state, dict):
+            return cls(state.get('last_id', 0), state.get('gaps', ()))
+        return cls(state or 0)
@@ -0,0 +1,136 @@
+"""Storage for the EOL flow tracking app: interviews and material flows in the database.
+
+Listing is paginated and filtered in SQL on the indexed columns, so the app only ever
+loads one page of records. `import_csv` moves the records of the old CSV files over.
+
+    python -m backend.db.flow_records import interviews "EOL flow modelling/interviews.csv"
+"""
+
+import math
+import os
+import sys
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.core.models import FlowRollup, Interview, MaterialFlow
+from backend.db.flow_rollups import increment_rollups, increment_rollups_frame
+
+# Indexed columns the app filters on, per model
+FILTER_COLUMNS = {
+    Interview: ('org', 'location', 'material_types', 'collection_method'),
+    MaterialFlow: ('source_org', 'source_location', 'material_type', 'collection_method')
+}
+
+MODELS = {'interviews': Interview, 'material_flows': MaterialFlow}
+
+def create_flow_tables(bind):
+    """Create the interview, material flow and rollup tables if they do not exist yet."""
+    Interview.metadata.create_all(bind, tables=[Interview.__table__, MaterialFlow.__table__, FlowRollup.__table__])
+
+def record_columns(model) -> List[str]:
+    return [column.key for column in model.__table__.columns if column.key != 'id']
+
+def add_record(session: Session, model, record: Dict):
+    """Insert one record (column -> value); unknown keys are rejected."""
+    unknown = set(record) - set(record_columns(model))
+    if unknown:
+        raise ValueError(f'Unknown {model.__tablename__} columns: {sorted(unknown)}')
+    row = model(**record)
+    session.add(row)
+    if model is MaterialFlow:
+        # Same transaction, so the rollups never count a flow that was not saved
+        increment_rollups(session, record)
+    session.commit()
+    return row
+
+def _filtered(model, filters: Optional[Dict] = None, start: Optional[date] = None, end: Optional[date] = None):
+    """SELECT conditions for equality filters on FILTER_COLUMNS and an inclusive date range."""
+    conditions = []
+    for column, value in (filters or {}).items():
+        if column not in FILTER_COLUMNS[model]:
+            raise ValueError(f'Cannot filter {model.__tablename__} on {column}')
+        if value is not None:
+            conditions.append(getattr(model, column) == value)
+    if start is not None:
+        conditions.append(model.timestamp >= datetime.combine(start, time.min))
+    if end is not None:
+        conditions.append(model.timestamp <= datetime.combine(end, time.max))
+    return conditions
+
+def count_records(session: Session, model, filters: Optional[Dict] = None,
+                  start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Number of records matching the filters."""
+    conditions = _filtered(model, filters, start, end)
+    return session.execute(select(func.count()).select_from(model).where(*conditions)).scalar_one()
+
+def query_records(session: Session, model, filters: Optional[Dict] = None, page: int = 1, page_size: int = 50,
+                  start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """One page of records matching the filters, newest first."""
+    conditions = _filtered(model, filters, start, end)
+    columns = [getattr(model, column) for column in ['id'] + record_columns(model)]
+    rows = session.execute(
+        select(*columns).where(*conditions)
+        .order_by(model.timestamp.desc(), model.id.desc())
+        .limit(page_size).offset((max(page, 1) - 1) * page_size)
+    ).all()
+    return pd.DataFrame(rows, columns=['id'] + record_columns(model))
+
+def table_version(session: Session, model) -> Tuple[int, int]:
+    """(record count, highest id) of the table; changes whenever a record is added or deleted.
+
+    The count is included because ids are handed out before commit: a record saved with a
+    lower id than the current highest one does not change the maximum.
+    """
+    count, highest = session.execute(select(func.count(), func.max(model.id)).select_from(model)).one()
+    return count, highest or 0
+
+def transport_inputs(session: Session) -> pd.DataFrame:
+    """The material flow columns the transport emissions need, for all flows."""
+    columns = ('id', 'source_org', 'material_type', 'source_location', 'destination', 'transport_mode',
+               'volume_kg_month')
+    rows = session.execute(select(*[getattr(MaterialFlow, column) for column in columns])
+                           .order_by(MaterialFlow.id)).all()
+    return pd.DataFrame(rows, columns=columns)
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, math.ceil(total / page_size))
+
+def distinct_values(session: Session, model, column: str, limit: int = 1000) -> List[str]:
+    """Distinct non-empty values of a filter column, for the filter select boxes."""
+    if column not in FILTER_COLUMNS[model]:
+        raise ValueError(f'Cannot filter {model.__tablename__} on {column}')
+    attribute = getattr(model, column)
+    return list(session.execute(
+        select(attribute).where(attribute.is_not(None), attribute != '').distinct().order_by(attribute).limit(limit)
+    ).scalars())
+
+def import_csv(session: Session, model, path, chunk_size: int = 5000) -> int:
+    """Bulk-insert the rows of a CSV written by the old app; columns the model lacks are ignored.
+
+    Records still waiting in the CSV's `.pending.jsonl` sidecar are imported as well.
+    """
+    data = pd.read_csv(path)
+    if os.path.exists(f'{path}.pending.jsonl'):
+        data = pd.concat([data, pd.read_json(f'{path}.pending.jsonl', lines=True, dtype=False)], ignore_index=True)
+    data = data[[column for column in data.columns if column in record_columns(model)]]
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    records = data.astype(object).where(data.notna(), None).to_dict('records')
+    for start in range(0, len(records), chunk_size):
+        session.execute(model.__table__.insert(), records[start:start + chunk_size])
+    if model is MaterialFlow:
+        increment_rollups_frame(session, data)
+    session.commit()
+    return len(records)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != 'import' or sys.argv[2] not in MODELS:
+        sys.exit('usage: python -m backend.db.flow_records import {interviews,material_flows} FILE.csv')
+    from backend.db.connection import SessionLocal, engine
+    create_flow_tables(engine)
+    with SessionLocal() as session:
+        count = import_csv(session, MODELS[sys.argv[2]], sys.argv[3])
+    print(f'Imported {count} {sys.argv[2]} from {sys.argv[3]}')
@@ -0,0 +1,156 @@
+"""Material flow totals per material type, source location, collection method and month.
+
+`flow_rollups` holds one row per (dimension, key) with the summed kg/month and number of
+flows. Saving a flow adds to its four rows with one UPDATE in the same transaction
+(`increment_rollups`), so summaries never scan `material_flows`. `rebuild_rollups`
+recomputes everything from the raw records and `check_rollups` reports where the stored
+totals differ from such a recomputation.
+
+    python -m backend.db.flow_rollups check
+    python -m backend.db.flow_rollups rebuild
+"""
+
+import sys
+from typing import Dict, Tuple
+
+import pandas as pd
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.models import FlowRollup, MaterialFlow
+
+ROLLUP_DIMENSIONS = ('material_type', 'source_location', 'collection_method', 'month')
+
+def _key(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value).strip()
+
+def rollup_keys(record: Dict) -> Dict[str, str]:
+    """Dimension -> key of one flow record."""
+    keys = {dimension: _key(record.get(dimension)) for dimension in ROLLUP_DIMENSIONS if dimension != 'month'}
+    keys['month'] = f'{pd.Timestamp(record["timestamp"]):%Y-%m}'
+    return keys
+
+def _rows(keys):
+    """WHERE clause for the rollup rows of `keys` ((dimension, key) pairs)."""
+    return or_(*[(FlowRollup.dimension == dimension) & (FlowRollup.key == key) for dimension, key in keys])
+
+def _increment(keys, volume: float, count: int):
+    return update(FlowRollup).where(_rows(keys)).values(
+        volume_kg_month=FlowRollup.volume_kg_month + volume, flow_count=FlowRollup.flow_count + count)
+
+def _create(session: Session, dimension: str, key: str, volume: float, count: int):
+    try:
+        with session.begin_nested():
+            session.execute(insert(FlowRollup).values(
+                dimension=dimension, key=key, volume_kg_month=volume, flow_count=count))
+    except IntegrityError:
+        # Another session created the row in the meantime
+        session.execute(_increment([(dimension, key)], volume, count))
+
+def _add(session: Session, keys, volume: float, count: int):
+    """Add to the rollup rows of `keys` with one UPDATE, creating the rows that do not exist yet."""
+    if session.execute(_increment(keys, volume, count)).rowcount == len(keys):
+        return
+    existing = set(session.execute(select(FlowRollup.dimension, FlowRollup.key).where(_rows(keys))).all())
+    for dimension, key in keys:
+        if (dimension, key) not in existing:
+            _create(session, dimension, key, volume, count)
+
+def increment_rollups(session: Session, record: Dict):
+    """Count one new flow record; the caller commits."""
+    _add(session, list(rollup_keys(record).items()), float(record.get('volume_kg_month') or 0.0), 1)
+
+def _totals(data: pd.DataFrame) -> Dict[Tuple[str, str], Tuple[float, int]]:
+    """(dimension, key) -> (kg/month, flows) for a DataFrame of flow records."""
+    missing = pd.Series(None, index=data.index, dtype=object)
+    volume = pd.to_numeric(data.get('volume_kg_month', missing), errors='coerce').fillna(0.0)
+    timestamps = pd.to_datetime(data['timestamp'])
+    totals = {}
+    for dimension in ROLLUP_DIMENSIONS:
+        if dimension == 'month':
+            # Group on an integer year * 100 + month and format only the distinct months
+            keys = timestamps.dt.year * 100 + timestamps.dt.month
+        else:
+            keys = data.get(dimension, missing).astype('string').str.strip().fillna('')
+        grouped = volume.groupby(keys.values).agg(['sum', 'count'])
+        for key, total, count in zip(grouped.index, grouped['sum'], grouped['count']):
+            if dimension == 'month':
+                key = f'{key // 100:04d}-{key % 100:02d}'
+            totals[(dimension, key)] = (float(total), int(count))
+    return totals
+
+def increment_rollups_frame(session: Session, data: pd.DataFrame):
+    """Count many new flow records (e.g. a bulk import) with one update per rollup row."""
+    if data.empty:
+        return
+    for key, (volume, count) in _totals(data).items():
+        _add(session, [key], volume, count)
+
+def _raw_flows(session: Session) -> pd.DataFrame:
+    columns = ['timestamp', 'volume_kg_month', *[d for d in ROLLUP_DIMENSIONS if d != 'month']]
+    rows = session.execute(select(*[getattr(MaterialFlow, column) for column in columns])).all()
+    return pd.DataFrame(rows, columns=columns)
+
+def rebuild_rollups(session: Session) -> int:
+    """Replace all rollups with totals recomputed from material_flows; returns the row count."""
+    totals = _totals(_raw_flows(session))
+    session.execute(delete(FlowRollup))
+    if totals:
+        session.execute(insert(FlowRollup), [
+            {'dimension': dimension, 'key': key, 'volume_kg_month': volume, 'flow_count': count}
+            for (dimension, key), (volume, count) in totals.items()
+        ])
+    session.commit()
+    return len(totals)
+
+def check_rollups(session: Session, tolerance: float = 1e-6) -> pd.DataFrame:
+    """Rollup rows that differ from a full recomputation (empty when consistent).
+
+    Volumes are compared with a relative `tolerance`, since running sums of floats can
+    differ from a fresh sum in the last digits.
+    """
+    expected = _totals(_raw_flows(session))
+    stored = {
+        (row.dimension, row.key): (row.volume_kg_month, row.flow_count)
+        for row in session.execute(select(FlowRollup)).scalars()
+    }
+    mismatches = []
+    for dimension, key in sorted(set(expected) | set(stored)):
+        expected_volume, expected_count = expected.get((dimension, key), (0.0, 0))
+        stored_volume, stored_count = stored.get((dimension, key), (0.0, 0))
+        volume_off = abs(stored_volume - expected_volume) > tolerance * max(1.0, abs(expected_volume))
+        if volume_off or stored_count != expected_count:
+            mismatches.append((dimension, key, stored_volume, expected_volume, stored_count, expected_count))
+    return pd.DataFrame(mismatches, columns=['dimension', 'key', 'stored_volume', 'expected_volume',
+                                             'stored_count', 'expected_count'])
+
+def rollup(session: Session, dimension: str) -> pd.DataFrame:
+    """kg/month and number of flows per key of one dimension, largest volume first (by month for months)."""
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f'Unknown rollup dimension: {dimension}')
+    order = FlowRollup.key if dimension == 'month' else FlowRollup.volume_kg_month.desc()
+    rows = session.execute(
+        select(FlowRollup.key, FlowRollup.volume_kg_month, FlowRollup.flow_count)
+        .where(FlowRollup.dimension == dimension).order_by(order)
+    ).all()
+    return pd.DataFrame(rows, columns=[dimension, 'volume_kg_month', 'flow_count']).set_index(dimension)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in ('check', 'rebuild'):
+        sys.exit('usage: python -m backend.db.flow_rollups {check,rebuild}')
+    from backend.db.connection import SessionLocal, engine
+    from backend.db.flow_records import create_flow_tables
+    create_flow_tables(engine)
+    with SessionLocal() as session:
+        if sys.argv[1] == 'rebuild':
+            print(f'Rebuilt {rebuild_rollups(session)} rollup rows')
+        else:
+            mismatches = check_rollups(session)
+            if mismatches.empty:
+                print('Rollups match the material flows')
+            else:
+                print(mismatches.to_string(index=False))
+                sys.exit(1)
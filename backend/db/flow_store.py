@@ -0,0 +1,296 @@
+"""Columnar mirror of the flow tracking records for analytics (Parquet, partitioned by month).
+
+Each table is a hive-partitioned Parquet dataset, `<store>/<table>/month=YYYY-MM/*.parquet`,
+with an explicit schema: small integer types for the scores and dictionary (categorical)
+encoding for the enum-like fields. Reads go through memory-mapped files and only load the
+requested columns from the months overlapping the requested date range.
+
+`sync_store` appends the database rows added since the last sync, including rows committed
+after rows with higher ids (see `backend.core.watermark`); it holds a file lock, so the app
+and the CLI can sync at the same time, and skips ids a partition already holds, so a sync
+interrupted before saving its progress does not duplicate rows. `convert_csv`
+migrates the CSV files written by the old app (through the database, which assigns the ids).
+
+    python -m backend.db.flow_store sync
+    python -m backend.db.flow_store convert interviews "EOL flow modelling/interviews.csv"
+"""
+
+import json
+import os
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from typing import Dict, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: only syncs within one process are serialized
+    fcntl = None
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.core.models import Interview, MaterialFlow
+from backend.core.watermark import IdWatermark
+from backend.db.flow_records import count_records, create_flow_tables, import_csv
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         'EOL flow modelling', 'flow_store')
+
+# Merge a month's files into one once it has this many (each sync adds one file per month)
+COMPACT_AFTER_FILES = int(os.environ.get('FLOW_STORE_COMPACT_AFTER', 20))
+
+RISK_COLUMNS = ('risk_financial', 'risk_technical', 'risk_operational',
+                'risk_regulatory', 'risk_market', 'risk_environmental')
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMAS = {
+    'interviews': pa.schema([
+        ('id', pa.int64()), ('timestamp', pa.timestamp('us')),
+        ('name', pa.string()), ('role', CATEGORY), ('org', pa.string()), ('location', pa.string()),
+        ('material_types', pa.string()), ('collection_method', CATEGORY), ('volume', pa.float64()),
+        ('transportation', CATEGORY), ('processing_tech', pa.string()),
+        ('current_eol', pa.string()), ('missing_eol', pa.string()), ('value_chain_exp', pa.string()),
+        *[(column, pa.int8()) for column in RISK_COLUMNS],
+        ('value_chain_type', CATEGORY), ('responsibility', CATEGORY), ('proximity', pa.int8()),
+        ('material_trace', CATEGORY), ('risks', pa.string()), ('interest', CATEGORY)
+    ]),
+    'material_flows': pa.schema([
+        ('id', pa.int64()), ('timestamp', pa.timestamp('us')),
+        ('source_org', pa.string()), ('source_type', CATEGORY), ('material_type', CATEGORY),
+        ('volume_kg_month', pa.float64()), ('source_location', pa.string()),
+        ('collection_method', CATEGORY), ('transport_mode', CATEGORY),
+        ('destination', pa.string()), ('processor', pa.string()), ('notes', pa.string())
+    ])
+}
+
+MODELS = {'interviews': Interview, 'material_flows': MaterialFlow}
+
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+
+def store_dir() -> str:
+    return os.environ.get('FLOW_STORE_DIR', STORE_DIR)
+
+def _table_dir(table: str, root: Optional[str] = None) -> str:
+    if table not in SCHEMAS:
+        raise ValueError(f'Unknown flow store table: {table}')
+    return os.path.join(root or store_dir(), table)
+
+def _state_path(root: Optional[str] = None) -> str:
+    return os.path.join(root or store_dir(), 'state.json')
+
+def _load_state(root: Optional[str] = None) -> Dict[str, Dict]:
+    try:
+        with open(_state_path(root)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def _save_state(state: Dict[str, Dict], root: Optional[str] = None):
+    path = _state_path(root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+def to_arrow(table: str, data: pd.DataFrame) -> pa.Table:
+    """Records as an Arrow table with the store schema; missing columns become nulls."""
+    schema = SCHEMAS[table]
+    data = data.reset_index(drop=True)
+    if 'id' not in data:
+        data = data.assign(id=pd.RangeIndex(1, len(data) + 1))
+    columns = []
+    for field in schema:
+        values = data[field.name] if field.name in data else pd.Series([None] * len(data), dtype=object)
+        if field.name == 'timestamp':
+            values = pd.to_datetime(values)
+        elif pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+            values = values.astype('string')
+        elif pa.types.is_integer(field.type):
+            values = pd.to_numeric(values, errors='coerce').round()
+        else:
+            values = pd.to_numeric(values, errors='coerce')
+        columns.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def _write_file(data: pa.Table, month_dir: str):
+    name = f'part-{uuid.uuid4().hex}.parquet'
+    # Written under a hidden temporary name (ignored by dataset discovery), then renamed
+    pq.write_table(data, os.path.join(month_dir, f'.{name}.tmp'), compression='zstd')
+    os.replace(os.path.join(month_dir, f'.{name}.tmp'), os.path.join(month_dir, name))
+
+def _parquet_files(month_dir: str):
+    return sorted(os.path.join(month_dir, name) for name in os.listdir(month_dir)
+                  if name.endswith('.parquet') and not name.startswith('.'))
+
+def _stored_ids(month_dir: str) -> Optional[pa.Array]:
+    """Ids already in a month partition (only the id column is read)."""
+    files = _parquet_files(month_dir)
+    if not files:
+        return None
+    return pa.concat_arrays([
+        pq.read_table(path, columns=['id'], memory_map=True)['id'].combine_chunks() for path in files
+    ])
+
+def write_records(table: str, data: pd.DataFrame, root: Optional[str] = None) -> int:
+    """Append records to the store, one new file per month they fall in.
+
+    Records whose id is already stored in their month are skipped; returns how many were written.
+    """
+    if data.empty:
+        return 0
+    arrow = to_arrow(table, data)
+    month = pc.strftime(arrow['timestamp'], format='%Y-%m')
+    directory = _table_dir(table, root)
+    written = 0
+    for value in pc.unique(month).to_pylist():
+        part = arrow.filter(pc.equal(month, value))
+        month_dir = os.path.join(directory, f'month={value}')
+        os.makedirs(month_dir, exist_ok=True)
+        stored = _stored_ids(month_dir)
+        if stored is not None:
+            part = part.filter(pc.invert(pc.is_in(part['id'], value_set=stored)))
+        if part.num_rows == 0:
+            continue
+        _write_file(part, month_dir)
+        written += part.num_rows
+        if len(_parquet_files(month_dir)) >= COMPACT_AFTER_FILES:
+            compact_month(month_dir)
+    return written
+
+def compact_month(month_dir: str):
+    """Merge the files of one month partition into a single file."""
+    files = _parquet_files(month_dir)
+    if len(files) < 2:
+        return
+    merged = pa.concat_tables([pq.read_table(path, memory_map=True) for path in files])
+    _write_file(merged.sort_by('id'), month_dir)
+    for old in files:
+        os.remove(old)
+
+def dataset(table: str, root: Optional[str] = None) -> Optional[ds.Dataset]:
+    """The table as a memory-mapped Arrow dataset, or None if nothing was stored yet."""
+    directory = _table_dir(table, root)
+    if not os.path.isdir(directory):
+        return None
+    return ds.dataset(directory, schema=SCHEMAS[table].append(pa.field('month', pa.string())),
+                      format='parquet', partitioning=PARTITIONING,
+                      filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True))
+
+def read(table: str, columns: Optional[Sequence[str]] = None, start: Optional[date] = None,
+         end: Optional[date] = None, root: Optional[str] = None) -> pd.DataFrame:
+    """Records with a timestamp in [start, end] (inclusive dates), restricted to `columns`.
+
+    Months outside the range are skipped by their partition; dictionary columns come back
+    as pandas categoricals.
+    """
+    columns = list(columns or SCHEMAS[table].names)
+    source = dataset(table, root)
+    if source is None:
+        return to_arrow(table, pd.DataFrame()).select(columns).to_pandas()
+    condition = None
+    if start is not None:
+        condition = (ds.field('month') >= f'{start:%Y-%m}') & (
+            ds.field('timestamp') >= pa.scalar(datetime.combine(start, time.min), pa.timestamp('us')))
+    if end is not None:
+        upper = (ds.field('month') <= f'{end:%Y-%m}') & (
+            ds.field('timestamp') <= pa.scalar(datetime.combine(end, time.max), pa.timestamp('us')))
+        condition = upper if condition is None else condition & upper
+    return source.to_table(columns=columns, filter=condition).to_pandas()
+
+# Serializes syncs within a process (e.g. concurrent Streamlit sessions); the file lock
+# below does the same across processes (the app and the CLI)
+_thread_lock = threading.Lock()
+
+@contextmanager
+def _sync_lock(root: Optional[str] = None):
+    root = root or store_dir()
+    os.makedirs(root, exist_ok=True)
+    with _thread_lock, open(os.path.join(root, '.sync.lock'), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def sync_store(session: Session, root: Optional[str] = None) -> Dict[str, int]:
+    """Append the database rows added since the last sync; returns rows written per table.
+
+    Progress is saved after each table, and rows that are stored already are skipped, so
+    running it again after a failure never duplicates records.
+    """
+    with _sync_lock(root):
+        state = _load_state(root)
+        written = {}
+        for table, model in MODELS.items():
+            watermark = IdWatermark.from_state(state.get(table))
+            columns = [getattr(model, name) for name in SCHEMAS[table].names]
+            rows = session.execute(select(*columns).where(watermark.condition(model.id)).order_by(model.id)).all()
+            data = pd.DataFrame(rows, columns=SCHEMAS[table].names)
+            written[table] = write_records(table, data, root)
+            watermark.advance(data['id'])
+            if watermark.to_state() != state.get(table):
+                state[table] = watermark.to_state()
+                _save_state(state, root)
+    return written
+
+def convert_csv(session: Session, table: str, path: str, root: Optional[str] = None) -> int:
+    """One-shot migration of a CSV written by the old app into the database and the store.
+
+    The database stays the source of the ids, so the CSV rows are imported there (only
+    into an empty table, so running it twice does not duplicate them) and then mirrored.
+    """
+    model = MODELS[table]
+    if count_records(session, model) == 0:
+        import_csv(session, model, path)
+    return sync_store(session, root)[table]
+
+# --- Analytics ------------------------------------------------------------------------------
+
+def risk_distribution(start: Optional[date] = None, end: Optional[date] = None,
+                      root: Optional[str] = None) -> pd.DataFrame:
+    """Number of interviews per score (rows, 1-8) for each risk column."""
+    data = read('interviews', RISK_COLUMNS, start, end, root)
+    return pd.DataFrame({
+        column: data[column].value_counts().reindex(range(1, 9), fill_value=0) for column in RISK_COLUMNS
+    }).rename_axis('score')
+
+def volume_by_collection_method(table: str = 'material_flows', start: Optional[date] = None,
+                                end: Optional[date] = None, root: Optional[str] = None) -> pd.Series:
+    """Total kg/month per collection method (interviews or material flows)."""
+    volume = 'volume_kg_month' if table == 'material_flows' else 'volume'
+    data = read(table, ['collection_method', volume], start, end, root)
+    return data.groupby('collection_method', observed=True)[volume].sum().sort_values(ascending=False)
+
+def value_chain_type_counts(start: Optional[date] = None, end: Optional[date] = None,
+                            root: Optional[str] = None) -> pd.Series:
+    """Number of interviews per value chain type."""
+    data = read('interviews', ['value_chain_type'], start, end, root)
+    return data['value_chain_type'].value_counts()
+
+if __name__ == "__main__":
+    usage = ('usage: python -m backend.db.flow_store sync\n'
+             '       python -m backend.db.flow_store convert {interviews,material_flows} FILE.csv')
+    if sys.argv[1:2] == ['sync'] and len(sys.argv) == 2:
+        from backend.db.connection import SessionLocal
+        with SessionLocal() as session:
+            for name, count in sync_store(session).items():
+                print(f'Stored {count} new {name}')
+    elif sys.argv[1:2] == ['convert'] and len(sys.argv) == 4 and sys.argv[2] in SCHEMAS:
+        from backend.db.connection import SessionLocal, engine
+        create_flow_tables(engine)
+        with SessionLocal() as session:
+            print(f'Stored {convert_csv(session, sys.argv[2], sys.argv[3])} {sys.argv[2]} from {sys.argv[3]}')
+    else:
+        sys.exit(usage)
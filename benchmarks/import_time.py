@@ -0,0 +1,73 @@
+"""Cold-import budget for the NumPy-only compute path.
+
+    python benchmarks/import_time.py [--budget SECONDS] [--repeat N]
+
+Every module is imported in a fresh interpreter. The check fails (exit code 1) when the
+median import time exceeds the budget, or when a plotting/statistics package is loaded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules used by API and batch workers; they may only depend on NumPy
+COMPUTE_MODULES = (
+    'analysis.scenarios.core',
+    'analysis.scenarios.materials',
+    'analysis.scenarios.cascade',
+    'analysis.scenarios.uncertainty',
+    'analysis.scenarios.recycling',
+    'backend.core.batch'
+)
+
+HEAVY_MODULES = ('matplotlib', 'scipy', 'pandas')
+
+IMPORT_BUDGET_SECONDS = float(os.environ.get('IMPORT_BUDGET_SECONDS', '0.5'))
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+def cold_import(module):
+    """Import time (seconds) of `module` in a new interpreter and the heavy packages it loaded."""
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['seconds'], result['heavy']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check cold-import time of the compute modules.')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_SECONDS, help='seconds per module')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per module')
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in COMPUTE_MODULES:
+        runs = [cold_import(module) for _ in range(args.repeat)]
+        median = statistics.median(seconds for seconds, _ in runs)
+        heavy = sorted({name for _, loaded in runs for name in loaded})
+        status = 'ok'
+        if median > args.budget:
+            status = 'OVER BUDGET'
+            failures.append(module)
+        if heavy:
+            status = 'imports ' + ', '.join(heavy)
+            failures.append(module)
+        print(f"{module:<35} {median * 1000:8.1f} ms  {status}")
+
+    print(f"budget {args.budget * 1000:.0f} ms per module")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""Local benchmark suite for the calculator, recycling math, figures and flow-app storage.
+
+    python -m benchmarks.run                                  # run everything
+    python -m benchmarks.run --filter calculator cascade      # names containing any of these
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --compare before.json            # run, then flag regressions
+    python -m benchmarks.run --results after.json --compare before.json   # compare saved runs
+
+Everything runs locally: the reference database is a temporary SQLite file seeded by
+benchmarks/seed.py and figures are written to a temporary plots directory. A benchmark
+regresses when its median time exceeds the baseline median by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, 'benchmarks', 'results', 'latest.json')
+
+WORK_DIR = tempfile.mkdtemp(prefix='lca-benchmarks-')
+
+@dataclass
+class Benchmark:
+    """`setup()` prepares the inputs and returns the callable that is timed."""
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    repeat: int = 5
+
+BENCHMARKS: List[Benchmark] = []
+
+def benchmark(name, repeat=5):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, repeat))
+        return setup
+    return register
+
+# --- Emissions calculator on SQLite ---------------------------------------------------
+
+@lru_cache(maxsize=None)
+def session_factory():
+    from benchmarks.seed import create_benchmark_database
+    return create_benchmark_database(os.environ['DATABASE_URL'])
+
+def manufacturing_scenarios(n, seed=0):
+    import numpy as np
+    from backend.core.calculator import ManufacturingScenario
+    from backend.core.models import GridMix, Material, Process
+    session = session_factory()()
+    names = [[row.name for row in session.query(model.name)] for model in (Material, Process, GridMix)]
+    session.close()
+    rng = np.random.default_rng(seed)
+    picks = [rng.integers(len(options), size=n) for options in names]
+    masses = rng.uniform(0.1, 100.0, size=n)
+    return [
+        ManufacturingScenario(names[0][m], names[1][p], names[2][g], float(mass))
+        for m, p, g, mass in zip(*picks, masses)
+    ]
+
+def compare_scenarios_setup(n):
+    def setup():
+        from backend.core.calculator import EmissionsCalculator
+        from backend.core.reference_data import ReferenceDataCache
+        scenarios = manufacturing_scenarios(n)
+
+        def run():
+            # Fresh cache per run, so the reference queries are part of the timing
+            session = session_factory()()
+            try:
+                return EmissionsCalculator(session, cache=ReferenceDataCache()).compare_scenarios(scenarios)
+            finally:
+                session.close()
+        return run
+    return setup
+
+benchmark('calculator.compare_scenarios[10]', repeat=20)(compare_scenarios_setup(10))
+benchmark('calculator.compare_scenarios[1k]', repeat=10)(compare_scenarios_setup(1_000))
+benchmark('calculator.compare_scenarios[100k]', repeat=3)(compare_scenarios_setup(100_000))
+
+# --- Recycling scenario math ------------------------------------------------------------
+
+@benchmark('recycling.emissions_grid[5x1000x101x3]', repeat=10)
+def recycling_grid():
+    import numpy as np
+    from analysis.scenarios.core import default_scenarios
+    scenarios = default_scenarios()
+    weights = np.linspace(0.01, 10.0, 1000)
+    scraps = np.arange(101)
+    materials = scenarios[0].materials.names
+    return lambda: [s.calculate_emissions_grid(weights, scraps, materials) for s in scenarios]
+
+@benchmark('recycling.scalar_sweep[5x101x3]', repeat=10)
+def recycling_scalar_sweep():
+    from analysis.scenarios.core import default_scenarios
+    scenarios = default_scenarios()
+    materials = scenarios[0].materials.names
+    return lambda: [
+        s.calculate_emissions_with_material(1.0, scrap, material)
+        for s in scenarios for scrap in range(101) for material in materials
+    ]
+
+@benchmark('recycling.monte_carlo[100k]', repeat=3)
+def recycling_monte_carlo():
+    from analysis.scenarios.core import default_scenarios
+    from analysis.scenarios.uncertainty import Relative, run_monte_carlo
+    scenarios = default_scenarios()
+    distributions = {
+        'granulator_energy_mj': Relative('lognormal', 0.2),
+        'pelletizing_energy_mj': Relative('lognormal', 0.2),
+        'de_grid_co2_per_mj': Relative('normal', 0.1),
+        'virgin_co2_per_kg': Relative('triangular', 0.15)
+    }
+    return lambda: run_monte_carlo(scenarios, distributions, 100_000, max_workers=1)
+
+# --- Cascade ------------------------------------------------------------------------------
+
+@benchmark('cascade.simulate[10k x 50 cycles]', repeat=10)
+def cascade_simulate():
+    import numpy as np
+    from analysis.scenarios.cascade import simulate_cascade
+    rng = np.random.default_rng(0)
+    n = 10_000
+    initial, recycling, virgin = rng.uniform(1, 10, n), rng.uniform(0.1, 1, n), rng.uniform(2, 15, n)
+    yields, degradation = rng.uniform(0.8, 1.0, n), rng.uniform(0.0, 0.05, n)
+    return lambda: simulate_cascade(initial, recycling, virgin, 50, yields, 0.1, degradation)
+
+@benchmark('cascade.scenario_cascade[5 scenarios]', repeat=20)
+def cascade_scenarios():
+    from analysis.scenarios.cascade import scenario_cascade
+    from analysis.scenarios.core import default_scenarios, spiral_scenario
+    scenarios, spiral = default_scenarios(), spiral_scenario()
+    return lambda: scenario_cascade(scenarios, spiral, 'PEEK', 70, n_cycles=50)
+
+# --- Figures --------------------------------------------------------------------------------
+
+def figure_setup(job):
+    def setup():
+        import matplotlib
+        matplotlib.use('Agg', force=True)
+        import matplotlib.pyplot as plt
+
+        def run():
+            job.func(*job.args, **job.kwargs)
+            plt.close('all')
+        return run
+    return setup
+
+def register_figures():
+    from analysis.plots import all_jobs
+    for job in all_jobs():
+        benchmark(f'figure.{job.name}', repeat=2)(figure_setup(job))
+
+# --- Flow app database storage --------------------------------------------------------------
+
+@benchmark('flow_app.add_record[db]', repeat=20)
+def flow_add_record():
+    from datetime import datetime
+    from backend.core.models import MaterialFlow
+    from backend.db.flow_records import add_record
+    factory = session_factory()
+
+    def run():
+        with factory() as session:
+            add_record(session, MaterialFlow, {
+                'timestamp': datetime.now(), 'source_org': 'Airline', 'material_type': 'TPC',
+                'volume_kg_month': 500, 'source_location': 'Utrecht', 'collection_method': 'Third-Party Contractor'
+            })
+    return run
+
+def flow_frame(n, seed=0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'source_org': [f'Organization {i}' for i in rng.integers(0, 500, n)],
+        'source_type': rng.choice(['Airline', 'MRO Facility', 'Aircraft Manufacturer'], n),
+        'material_type': rng.choice(['PEEK', 'PPS', 'PA6'], n),
+        'volume_kg_month': rng.uniform(0, 1000, n),
+        'destination': [f'Hub {i}' for i in rng.integers(0, 20, n)],
+        'processor': [f'Processor {i}' for i in rng.integers(0, 5, n)]
+    })
+
+@benchmark('flow_graph.build[100k flows]', repeat=5)
+def flow_graph_build():
+    from backend.core.flow_graph import FlowGraph
+    data = flow_frame(100_000)
+    return lambda: FlowGraph.from_frame(data)
+
+@benchmark('flow_graph.add[1 flow, 100k in graph]', repeat=20)
+def flow_graph_add():
+    from backend.core.flow_graph import FlowGraph
+    graph = FlowGraph.from_frame(flow_frame(100_000))
+    record = flow_frame(1, seed=1).iloc[0].to_dict()
+    return lambda: graph.add(record)
+
+@benchmark('flow_graph.sankey[100k flows]', repeat=10)
+def flow_graph_sankey():
+    from backend.core.flow_graph import FlowGraph
+    graph = FlowGraph.from_frame(flow_frame(100_000))
+    return lambda: (graph.sankey(max_edges=100), graph.upstream('Processor 0'))
+
+@lru_cache(maxsize=None)
+def flow_database_50k():
+    """Session factory of the benchmark database with 50k material flows and their rollups."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from backend.core.models import MaterialFlow
+    from backend.db.flow_rollups import rebuild_rollups
+    factory = session_factory()
+    with factory() as session:
+        start = datetime(2025, 1, 1)
+        session.execute(insert(MaterialFlow), [
+            {'timestamp': start + timedelta(hours=i), 'source_org': f'Organization {i % 200}',
+             'material_type': ('PEEK', 'PPS', 'PA6')[i % 3], 'source_location': 'Utrecht',
+             'collection_method': 'Third-Party Contractor', 'volume_kg_month': float(i % 1000)}
+            for i in range(50_000)
+        ])
+        session.commit()
+        rebuild_rollups(session)
+    return factory
+
+@benchmark('flow_app.filtered_page[50k flows]', repeat=20)
+def flow_filtered_page():
+    from backend.core.models import MaterialFlow
+    from backend.db.flow_records import count_records, query_records
+    factory = flow_database_50k()
+    filters = {'source_org': 'Organization 7', 'material_type': 'PPS'}
+
+    def run():
+        with factory() as session:
+            return count_records(session, MaterialFlow, filters), query_records(session, MaterialFlow, filters, 2, 50)
+    return run
+
+@benchmark('flow_rollups.summaries[50k flows]', repeat=20)
+def flow_rollup_summaries():
+    from backend.db.flow_rollups import ROLLUP_DIMENSIONS, rollup
+    factory = flow_database_50k()
+
+    def run():
+        with factory() as session:
+            return [rollup(session, dimension) for dimension in ROLLUP_DIMENSIONS]
+    return run
+
+@benchmark('flow_rollups.check[50k flows]', repeat=3)
+def flow_rollup_check():
+    from backend.db.flow_rollups import check_rollups
+    factory = flow_database_50k()
+
+    def run():
+        with factory() as session:
+            return check_rollups(session)
+    return run
+
+@benchmark('flow_app.add_record[100 saves, 50k flows]', repeat=5)
+def flow_add_record_throughput():
+    """Sequential form saves, each in its own session and commit, into a table that already holds 50k flows."""
+    from datetime import datetime
+    from backend.core.models import MaterialFlow
+    from backend.db.flow_records import add_record
+    factory = flow_database_50k()
+
+    def run():
+        for i in range(100):
+            with factory() as session:
+                add_record(session, MaterialFlow, {
+                    'timestamp': datetime.now(), 'source_org': f'Organization {i % 200}',
+                    'material_type': ('PEEK', 'PPS', 'PA6')[i % 3], 'volume_kg_month': 500,
+                    'source_location': 'Utrecht', 'collection_method': 'Third-Party Contractor'
+                })
+    return run
+
+@benchmark('flow_import.material_flows[100k rows]', repeat=3)
+def flow_bulk_import():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend.db.flow_import import import_file
+    from backend.db.flow_records import create_flow_tables
+    data = flow_frame(100_000).drop(columns='id')
+    data['timestamp'] = '2025-05-22 14:46:18'
+    data['collection_method'] = 'Third-Party Contractor'
+    path = os.path.join(WORK_DIR, 'bulk_flows.csv')
+    data.to_csv(path, index=False)
+    runs = iter(range(1_000))
+
+    def run():
+        # A fresh database per run, so every run inserts into an empty table
+        engine = create_engine(f"sqlite:///{os.path.join(WORK_DIR, f'bulk_import_{next(runs)}.db')}")
+        create_flow_tables(engine)
+        with sessionmaker(bind=engine)() as session:
+            return import_file(session, 'material_flows', path)
+    return run
+
+# --- Stakeholder risk scoring -----------------------------------------------------------------
+
+def interview_frame(n, seed=0):
+    import numpy as np
+    import pandas as pd
+    from backend.core.risk_scoring import INTEREST_RISK, RISK_COLUMNS, TRACEABILITY_RISK, VALUE_CHAIN_RISK
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1), 'name': [f'Stakeholder {i}' for i in range(n)], 'org': 'Organization',
+        'role': rng.choice(['Recycler', 'MRO Facility', 'Airline (EoL Supplier)', 'Other'], n),
+        'location': [f'City {i}' for i in rng.integers(0, 100, n)],
+        **{column: rng.integers(1, 9, n) for column in RISK_COLUMNS},
+        'proximity': rng.integers(1, 6, n),
+        'material_trace': rng.choice(list(TRACEABILITY_RISK), n),
+        'value_chain_type': rng.choice(list(VALUE_CHAIN_RISK), n),
+        'interest': rng.choice(list(INTEREST_RISK), n)
+    })
+
+@benchmark('risk_scoring.composite[100k interviews]', repeat=10)
+def risk_composite():
+    from backend.core.risk_scoring import composite_scores
+    data = interview_frame(100_000)
+    return lambda: composite_scores(data)
+
+@benchmark('risk_scoring.top10[100k interviews]', repeat=20)
+def risk_top_k():
+    from backend.core.risk_scoring import RiskIndex
+    index = RiskIndex()
+    index.add_frame(interview_frame(100_000))
+    return lambda: (index.top(10), index.top(10, role='Recycler', location='City 7'))
+
+# --- Transport emissions ---------------------------------------------------------------------
+
+def transport_frame(n, seed=0):
+    import numpy as np
+    import pandas as pd
+    from backend.core.transport import load_gazetteer
+    names = load_gazetteer()[0].names
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'source_location': rng.choice(names + ['Unknown Town'], n),
+        'destination': rng.choice(names, n),
+        'transport_mode': rng.choice(['Truck', 'rail', 'Barge', 'lorry'], n),
+        'volume_kg_month': rng.uniform(0, 1000, n)
+    })
+
+@benchmark('transport.encode[100k flows]', repeat=5)
+def transport_encode():
+    from backend.core.transport import encode_flows
+    data = transport_frame(100_000)
+    return lambda: encode_flows(data)
+
+@benchmark('transport.recompute[100k flows]', repeat=50)
+def transport_recompute():
+    from backend.core.transport import TRANSPORT_MODES, TransportMode, encode_flows, transport_emissions
+    flows = encode_flows(transport_frame(100_000))
+    modes = {**TRANSPORT_MODES, 'truck': TransportMode(0.09, 1.25)}
+    return lambda: transport_emissions(flows, modes)
+
+# --- Runner --------------------------------------------------------------------------------
+
+def run_benchmark(bench: Benchmark):
+    run = bench.setup()
+    times = []
+    for _ in range(bench.repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'max_s': max(times),
+        'repeat': bench.repeat
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_all(filters=None):
+    results = {}
+    for bench in BENCHMARKS:
+        if filters and not any(f in bench.name for f in filters):
+            continue
+        results[bench.name] = run_benchmark(bench)
+        print(f"{bench.name:<45} {results[bench.name]['median_s'] * 1000:10.2f} ms")
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+
+def compare(current, baseline, threshold):
+    """Print median ratios against the baseline and return the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            print(f"{name:<45} {'-':>12} {result['median_s'] * 1000:10.2f} ms {'new':>7}")
+            continue
+        before = baseline['results'][name]['median_s']
+        ratio = result['median_s'] / before if before else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<45} {before * 1000:10.2f} ms {result['median_s'] * 1000:10.2f} ms {ratio:6.2f}x{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the local benchmark suite.')
+    parser.add_argument('--filter', nargs='+', metavar='TEXT', help='only run benchmarks whose name contains TEXT')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to save the results JSON')
+    parser.add_argument('--results', help='compare this saved results file instead of running')
+    parser.add_argument('--compare', metavar='BASELINE', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown of the median before flagging (default 0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    if args.results:
+        with open(args.results) as f:
+            current = json.load(f)
+    else:
+        # Never benchmark against a configured production database
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'reference.db')}"
+        os.environ['LCA_PLOTS_DIR'] = os.path.join(WORK_DIR, 'plots')
+        if REPO_ROOT not in sys.path:
+            sys.path.insert(0, REPO_ROOT)
+        register_figures()
+        current = run_all(args.filter)
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Local SQLite stand-in for the Postgres reference database used by the benchmarks.
+
+Seeds the rows from backend/db/seed_data.py plus synthetic materials, processes and grid
+mixes, so bulk lookups resolve realistic numbers of distinct names.
+"""
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models import GridMix, Material, MaterialType, Process, ProcessType
+from backend.db.seed_data import create_tables, seed_data
+
+def seed_benchmark_data(session_factory, n_materials=200, n_processes=50, n_grid_mixes=30, seed=0):
+    """Seed the example rows and `n_*` synthetic rows per reference table."""
+    seed_data(session_factory)
+    rng = np.random.default_rng(seed)
+    session = session_factory()
+    session.add_all([
+        Material(name=f'Benchmark material {i:04d}', type=MaterialType.thermoplastic,
+                 density=float(rng.uniform(0.9, 1.6)), production_emissions=float(rng.uniform(1.0, 20.0)))
+        for i in range(n_materials)
+    ])
+    session.add_all([
+        Process(name=f'Benchmark process {i:04d}', type=ProcessType.injection_molding,
+                energy_consumption=float(rng.uniform(0.2, 2.0)),
+                # Some processes have no direct emissions factor, like in production data
+                emissions_factor=float(rng.uniform(0.0, 0.5)) if i % 4 else None)
+        for i in range(n_processes)
+    ])
+    session.add_all([
+        GridMix(name=f'Benchmark grid mix {i:04d}', emissions_factor=float(rng.uniform(0.05, 1.3)),
+                country_code='XX')
+        for i in range(n_grid_mixes)
+    ])
+    session.commit()
+    session.close()
+
+def create_benchmark_database(url):
+    """Create and seed a database at `url`; returns its session factory."""
+    engine = create_engine(url)
+    create_tables(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed_benchmark_data(session_factory)
+    return session_factory
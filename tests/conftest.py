@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+# backend.db.connection builds its engines at import time, so point it at SQLite first
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture
+def reference_db(tmp_path):
+    """Session factory of a SQLite database seeded like the benchmark database."""
+    from benchmarks.seed import create_benchmark_database
+    return create_benchmark_database(f"sqlite:///{tmp_path / 'reference.db'}")
+
+@pytest.fixture(scope='session')
+def api_client():
+    """TestClient for the API against the seeded DATABASE_URL database."""
+    from fastapi.testclient import TestClient
+    from backend.api.routes import app
+    from backend.db.connection import SessionLocal, engine
+    from benchmarks.seed import seed_benchmark_data
+    from backend.db.seed_data import create_tables
+    create_tables(engine)
+    seed_benchmark_data(SessionLocal)
+    with TestClient(app) as client:
+        yield client
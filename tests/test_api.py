@@ -0,0 +1,71 @@
+import json
+
+PEEK = {"material_name": "Polyether Ether Ketone (PEEK)", "process_name": "Injection Molding for PP",
+        "grid_mix_name": "NL grid mix", "mass_kg": 2.0}
+
+def test_batch_reports_unknown_components_per_scenario(api_client):
+    scenarios = [PEEK, {**PEEK, "material_name": "Unobtainium"}, {**PEEK, "mass_kg": 3.0}]
+    response = api_client.post("/emissions/batch", json=scenarios)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[1]["error"] == "not_found"
+    assert lines[1]["missing"] == [{"component": "material", "name": "Unobtainium"}]
+    assert lines[2]["total_emissions_kg_co2e"] == 1.5 * lines[0]["total_emissions_kg_co2e"]
+
+def test_malformed_content_length_is_a_client_error(api_client):
+    response = api_client.post("/emissions/batch", content=b"[]",
+                               headers={"content-type": "application/json", "content-length": "abc"})
+    assert response.status_code == 400
+
+def test_etag_is_a_body_hash_and_checked_after_validation(api_client):
+    first = api_client.post("/emissions", json=PEEK)
+    etag = first.headers["etag"]
+    assert api_client.post("/emissions", json=PEEK, headers={"if-none-match": etag}).status_code == 304
+
+    from backend.core.response_cache import ResponseCache
+    assert etag == ResponseCache.etag(first.content)
+
+    unknown = {**PEEK, "material_name": "Unobtainium"}
+    assert api_client.post("/emissions", json=unknown, headers={"if-none-match": "*"}).status_code == 404
+    assert api_client.post("/emissions", json=unknown, headers={"if-none-match": etag}).status_code == 404
+
+def test_streamed_batches_are_instrumented(api_client):
+    from backend.api.routes import request_queries
+    from backend.core.reference_data import reference_cache
+    reference_cache.invalidate()
+    labels = ("POST", "/emissions/batch")
+    before = request_queries._values.get(labels, [None, 0.0, 0])[1:]
+    api_client.post("/emissions/batch", json=[PEEK, {**PEEK, "mass_kg": 3.0}])
+    total, count = request_queries._values[labels][1:]
+    assert count == before[1] + 1
+    assert total > before[0]
+
+def test_batch_slot_is_released_when_the_client_disconnects_before_streaming():
+    import asyncio
+    import pytest
+    from starlette.requests import ClientDisconnect
+    from backend.api.routes import SlotStreamingResponse
+
+    async def never_started():
+        raise AssertionError("the body should not be computed")
+        yield
+
+    async def disconnected(message):
+        raise OSError("connection reset")
+
+    async def run():
+        slots = asyncio.Semaphore(1)
+        await slots.acquire()
+        response = SlotStreamingResponse(never_started(), slots, media_type="application/x-ndjson")
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, disconnected)
+        return slots.locked()
+
+    assert asyncio.run(run()) is False
+
+def test_rejected_batches_do_not_take_a_slot(api_client):
+    from backend.api.routes import MAX_CONCURRENT_BATCHES, batch_slots
+    assert api_client.post("/emissions/batch", content=b"not json",
+                           headers={"content-type": "application/json"}).status_code in (400, 422)
+    api_client.post("/emissions/batch", json=[PEEK])
+    assert batch_slots._value == MAX_CONCURRENT_BATCHES
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from backend.core.batch import ReferenceTables, ScenarioBatch, calculate_batch_emissions
+from backend.core.calculator import EmissionsCalculator, ManufacturingScenario
+
+def test_batch_matches_scalar_calculator(reference_db):
+    with reference_db() as session:
+        tables = ReferenceTables.from_session(session)
+        rng = np.random.default_rng(0)
+        scenarios = [
+            ManufacturingScenario(str(rng.choice(tables.material_names)), str(rng.choice(tables.process_names)),
+                                  str(rng.choice(tables.grid_mix_names)), float(rng.uniform(0.1, 100)),
+                                  float(rng.uniform(0, 5)))
+            for _ in range(200)
+        ]
+        scalar = EmissionsCalculator(session, cache=None).compare_scenarios(scenarios)
+
+    batch = calculate_batch_emissions(ScenarioBatch.from_scenarios(scenarios, tables), tables)
+    np.testing.assert_allclose(batch["total_emissions_kg_co2e"],
+                               [result["total_emissions_kg_co2e"] for result in scalar])
+    for field in scalar[0]["breakdown"]:
+        np.testing.assert_allclose(batch[field], [result["breakdown"][field] for result in scalar])
+
+def test_out_of_range_codes_are_rejected(reference_db):
+    with reference_db() as session:
+        tables = ReferenceTables.from_session(session)
+    for material_idx in (-1, len(tables.material_names)):
+        batch = ScenarioBatch([material_idx], [0], [0], [1.0])
+        with pytest.raises(ValueError, match="material index"):
+            calculate_batch_emissions(batch, tables)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.core.calculator import (AsyncEmissionsCalculator, EmissionsCalculator, ManufacturingScenario,
+                                     MissingComponentsError)
+from backend.db.connection import to_async_url
+from backend.core.reference_data import ReferenceDataCache
+
+def scenarios(count):
+    return [ManufacturingScenario(f"Benchmark material {i % 20:04d}", f"Benchmark process {i % 10:04d}",
+                                  f"Benchmark grid mix {i % 5:04d}", 1.0 + i)
+            for i in range(count)]
+
+@pytest.fixture
+def statements(reference_db):
+    """SQL statements run on the reference database while the test is active."""
+    executed = []
+    with reference_db() as session:
+        engine = session.get_bind()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", _record)
+
+def test_compare_scenarios_runs_one_in_query_per_table(reference_db, statements):
+    with reference_db() as session:
+        results = EmissionsCalculator(session, cache=ReferenceDataCache()).compare_scenarios(scenarios(100))
+    assert len(results) == 100
+
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert len(selects) == 3
+    for table in ("materials", "processes", "grid_mix"):
+        assert sum(f"FROM {table}" in statement and " IN " in statement for statement in selects) == 1
+
+def test_missing_components_are_reported_per_scenario(reference_db):
+    batch = scenarios(4)
+    batch[1] = ManufacturingScenario("Unobtainium", "Benchmark process 0001", "Benchmark grid mix 0001", 1.0)
+    batch[3] = ManufacturingScenario("Unobtainium", "Levitation", "Moon grid", 1.0)
+    with reference_db() as session:
+        with pytest.raises(MissingComponentsError) as raised:
+            EmissionsCalculator(session, cache=None).compare_scenarios(batch)
+    assert raised.value.missing == {
+        1: [("material", "Unobtainium")],
+        3: [("material", "Unobtainium"), ("process", "Levitation"), ("grid mix", "Moon grid")],
+    }
+
+def run_async(reference_db, batch, cache):
+    """compare_scenarios of AsyncEmissionsCalculator over aiosqlite on the same database file."""
+    with reference_db() as session:
+        url = to_async_url(session.get_bind().url.render_as_string(hide_password=False))
+
+    async def compare():
+        engine = create_async_engine(url)
+        try:
+            async with async_sessionmaker(engine)() as session:
+                calculator = AsyncEmissionsCalculator(session, cache=cache)
+                return await calculator.compare_scenarios(batch), await calculator.calculate_scenario_emissions(batch[0])
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(compare())
+
+@pytest.mark.parametrize("cache", [None, ReferenceDataCache()], ids=["uncached", "cached"])
+def test_async_calculator_matches_sync_calculator(reference_db, cache):
+    batch = scenarios(60)
+    with reference_db() as session:
+        calculator = EmissionsCalculator(session, cache=None)
+        expected = calculator.compare_scenarios(batch), calculator.calculate_scenario_emissions(batch[0])
+    assert run_async(reference_db, batch, cache) == expected
+
+def test_async_calculator_reports_the_same_missing_components(reference_db):
+    batch = scenarios(3) + [ManufacturingScenario("Unobtainium", "Levitation", "Benchmark grid mix 0001", 1.0)]
+    with reference_db() as session:
+        with pytest.raises(MissingComponentsError) as expected:
+            EmissionsCalculator(session, cache=None).compare_scenarios(batch)
+    with pytest.raises(MissingComponentsError) as raised:
+        run_async(reference_db, batch, None)
+    assert raised.value.missing == expected.value.missing == {3: [("material", "Unobtainium"),
+                                                                  ("process", "Levitation")]}
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models import FlowRollup, Interview, MaterialFlow
+from backend.db.flow_records import add_record, count_records, create_flow_tables, table_version
+from backend.db.flow_rollups import check_rollups
+
+def test_concurrent_saves_neither_lose_nor_duplicate_records(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}", connect_args={'timeout': 30})
+    create_flow_tables(engine)
+    factory = sessionmaker(bind=engine)
+
+    def save(writer):
+        for i in range(25):
+            with factory() as session:
+                add_record(session, Interview, {'timestamp': datetime(2025, 3, 1), 'name': f'Writer {writer} #{i}'})
+                # Every writer adds to the same rollup rows
+                add_record(session, MaterialFlow, {'timestamp': datetime(2025, 3, 1), 'source_org': f'Writer {writer}',
+                                                   'material_type': 'PEEK', 'volume_kg_month': 1.0})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(8)))
+
+    with factory() as session:
+        names = session.execute(select(Interview.name)).scalars().all()
+        assert sorted(names) == sorted(f'Writer {writer} #{i}' for writer in range(8) for i in range(25))
+        ids = session.execute(select(MaterialFlow.id)).scalars().all()
+        assert len(ids) == len(set(ids)) == count_records(session, MaterialFlow) == 200
+        assert check_rollups(session).empty
+
+def test_table_version_changes_when_a_lower_id_is_committed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}")
+    create_flow_tables(engine)
+    with sessionmaker(bind=engine)() as session:
+        assert table_version(session, Interview) == (0, 0)
+        session.add_all([Interview(id=id, timestamp=datetime(2025, 3, 1), name=f'Interview {id}') for id in (1, 3)])
+        session.commit()
+        assert table_version(session, Interview) == (2, 3)
+        # A save that got id 2 but committed after id 3
+        session.add(Interview(id=2, timestamp=datetime(2025, 3, 1), name='Interview 2'))
+        session.commit()
+        assert table_version(session, Interview) == (3, 3)
+
+def test_rebuilding_rollups_twice_gives_the_same_rows(tmp_path):
+    from backend.db.flow_rollups import ROLLUP_DIMENSIONS, rebuild_rollups, rollup
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}")
+    create_flow_tables(engine)
+    with sessionmaker(bind=engine)() as session:
+        for i in range(30):
+            add_record(session, MaterialFlow, {'timestamp': datetime(2025, 1 + i % 3, 1),
+                                               'material_type': ('PEEK', 'PPS')[i % 2],
+                                               'source_location': f'Site {i % 4}', 'volume_kg_month': float(i)})
+        incremental = {dimension: rollup(session, dimension) for dimension in ROLLUP_DIMENSIONS}
+        first = rebuild_rollups(session)
+        assert rebuild_rollups(session) == first
+        for dimension in ROLLUP_DIMENSIONS:
+            pd.testing.assert_frame_equal(rollup(session, dimension).sort_index(), incremental[dimension].sort_index())
+        assert check_rollups(session).empty
+
+def test_rollup_row_created_by_another_session_is_incremented(tmp_path):
+    from backend.db.flow_rollups import _create
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}")
+    create_flow_tables(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as first, factory() as second:
+        # Both sessions found no row for the key; the second commits its insert first
+        _create(second, 'material_type', 'PEEK', 2.0, 1)
+        second.commit()
+        _create(first, 'material_type', 'PEEK', 3.0, 1)
+        first.commit()
+        assert first.execute(select(FlowRollup.volume_kg_month, FlowRollup.flow_count)).all() == [(5.0, 2)]
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models import Interview, MaterialFlow
+from backend.db import flow_store
+from backend.db.flow_records import add_record, create_flow_tables
+
+@pytest.fixture
+def flow_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}")
+    create_flow_tables(engine)
+    with sessionmaker(bind=engine)() as session:
+        start = datetime(2025, 1, 20)
+        for i in range(20):
+            add_record(session, Interview, {'timestamp': start + timedelta(days=i), 'name': f'Stakeholder {i}'})
+            add_record(session, MaterialFlow, {'timestamp': start + timedelta(days=i), 'source_org': f'Org {i}',
+                                               'volume_kg_month': float(i)})
+        yield session
+
+def test_rewriting_stored_ids_is_a_no_op(flow_session, tmp_path):
+    root = str(tmp_path / 'store')
+    assert flow_store.sync_store(flow_session, root) == {'interviews': 20, 'material_flows': 20}
+    data = flow_store.read('interviews', root=root)
+    assert flow_store.write_records('interviews', data, root) == 0
+    assert sorted(flow_store.read('interviews', ['id'], root=root)['id']) == list(range(1, 21))
+
+def test_failed_sync_does_not_duplicate_on_retry(flow_session, tmp_path, monkeypatch):
+    root = str(tmp_path / 'store')
+    write_records = flow_store.write_records
+
+    def failing(table, data, root=None):
+        # The flows reach the store, but the sync fails before recording its progress
+        write_records(table, data, root)
+        if table == 'material_flows':
+            raise OSError('disk full')
+        return len(data)
+
+    monkeypatch.setattr(flow_store, 'write_records', failing)
+    with pytest.raises(OSError):
+        flow_store.sync_store(flow_session, root)
+    monkeypatch.undo()
+
+    assert flow_store.sync_store(flow_session, root) == {'interviews': 0, 'material_flows': 0}
+    for table in ('interviews', 'material_flows'):
+        assert sorted(flow_store.read(table, ['id'], root=root)['id']) == list(range(1, 21))
+
+def save_with_id(session, id):
+    session.add(MaterialFlow(id=id, timestamp=datetime(2025, 3, 1), source_org='Late Org', volume_kg_month=1.0))
+    session.commit()
+
+def test_row_committed_below_the_synced_ids_is_picked_up(flow_session, tmp_path):
+    root = str(tmp_path / 'store')
+    flow_store.sync_store(flow_session, root)
+    # Ids 21 and 22 were handed out before 23, which committed first
+    save_with_id(flow_session, 23)
+    assert flow_store.sync_store(flow_session, root) == {'interviews': 0, 'material_flows': 1}
+    for id in (21, 22):
+        save_with_id(flow_session, id)
+        assert flow_store.sync_store(flow_session, root) == {'interviews': 0, 'material_flows': 1}
+    assert sorted(flow_store.read('material_flows', ['id'], root=root)['id']) == list(range(1, 24))
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from analysis.scenarios import materials
+from analysis.scenarios.core import RecyclingScenario
+from backend.core.models import Material, MaterialType
+
+@pytest.fixture(autouse=True)
+def restore_default_registry():
+    registry = materials.default_registry()
+    yield
+    materials.set_default_registry(registry)
+
+def test_database_only_material_resolves(reference_db):
+    with reference_db() as session:
+        session.add(Material(name='Polyoxymethylene (POM)', type=MaterialType.thermoplastic,
+                             production_emissions=3.1))
+        session.commit()
+    with pytest.raises(ValueError):
+        RecyclingScenario('Test', 0.33, 1.1).calculate_emissions_with_material(1.0, 70, 'POM')
+
+    materials.use_database_materials(reference_db)
+    scenario = RecyclingScenario('Test', 0.33, 1.1)
+    results = scenario.calculate_emissions_with_material(1.0, 70, 'POM')
+    assert scenario.material_co2_per_kg('POM') == 3.1
+    assert results['material_emissions'] == pytest.approx(0.3 * 3.1)
+    assert scenario.material_co2_per_kg('PP') == 2.5
+
+def test_unreadable_database_keeps_the_defaults(tmp_path):
+    # No tables in this database
+    factory = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+    registry = materials.use_database_materials(factory)
+    assert registry is materials.default_registry()
+    assert 'PA6' in registry
@@ -0,0 +1,15 @@
+from analysis.scenarios import materials
+from analysis.utils.plot_cache import job_key
+from analysis.visualizations import emissions_plots
+
+def test_job_keys_follow_the_material_registry():
+    jobs = emissions_plots.figure_jobs()
+    before = [job_key(job, style='style') for job in jobs]
+    registry = materials.default_registry()
+    try:
+        materials.set_default_registry(materials.MaterialRegistry(['PA6', 'PEEK', 'PPS'], [5.0, 13.7, 2.13]))
+        after = [job_key(job, style='style') for job in jobs]
+    finally:
+        materials.set_default_registry(registry)
+    assert all(old != new for old, new in zip(before, after))
+    assert [job_key(job, style='style') for job in jobs] == before
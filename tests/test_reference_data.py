@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core import reference_data
+from backend.core.models import GridMix, Material, Process
+from backend.core.reference_data import ReferenceDataCache, reference_cache
+
+def row(id, name):
+    return SimpleNamespace(id=id, name=name)
+
+@pytest.mark.parametrize("model", [Material, Process, GridMix])
+def test_committed_write_bumps_version_and_evicts(reference_db, model):
+    with reference_db() as session:
+        stored = session.query(model).order_by(model.id).first()
+        reference_cache.put(model, stored)
+        version = reference_cache.version
+        stored.name = stored.name + " (revised)"
+        session.flush()
+        # Nothing is dropped until the write is committed
+        assert reference_cache.version == version
+        session.commit()
+        assert reference_cache.version > version
+        assert reference_cache.get(model, "id", stored.id) is None
+
+def test_rolled_back_write_keeps_entries(reference_db):
+    with reference_db() as session:
+        stored = reference_cache.put(Material, session.query(Material).order_by(Material.id).first())
+        version = reference_cache.version
+        session.get(Material, stored.id).production_emissions = 0.0
+        session.flush()
+        session.rollback()
+    assert reference_cache.version == version
+    assert reference_cache.get(Material, "id", stored.id) is not None
+
+def test_expired_entries_are_reloaded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(reference_data.time, "monotonic", lambda: now[0])
+    cache = ReferenceDataCache(ttl_seconds=60)
+    cache.put(Material, row(1, "PP"))
+    now[0] += 59
+    assert cache.get(Material, "name", "PP").id == 1
+
+    now[0] += 2
+    assert cache.get(Material, "name", "PP") is None
+    cache.put(Material, row(1, "PP"))
+    assert cache.get(Material, "name", "PP").id == 1
+    assert cache.stats()["misses"] == 1
+
+def test_least_recently_used_rows_are_evicted_first():
+    # Each row takes two slots (name and id)
+    cache = ReferenceDataCache(max_size=4)
+    cache.put(Material, row(1, "PP"))
+    cache.put(Material, row(2, "PE"))
+    cache.get(Material, "name", "PP")
+    cache.get(Material, "id", 1)
+    cache.put(Material, row(3, "PET"))
+
+    assert cache.get(Material, "name", "PE") is None
+    assert cache.get(Material, "id", 2) is None
+    assert cache.get(Material, "name", "PP").id == 1
+    assert cache.get(Material, "name", "PET").id == 3
+    assert cache.stats()["evictions"] == 2
@@ -0,0 +1,19 @@
+import time
+
+from backend.core.reference_data import ReferenceDataCache
+from backend.core.response_cache import ResponseCache
+
+def test_entries_expire_with_the_reference_ttl():
+    cache = ResponseCache(reference=ReferenceDataCache(ttl_seconds=0.05))
+    body, etag = cache.put(("a",), {"total": 1})
+    assert cache.get(("a",)) == (body, etag)
+    time.sleep(0.06)
+    assert cache.get(("a",)) is None
+    assert cache.size_bytes == 0
+
+def test_invalidation_drops_entries():
+    reference = ReferenceDataCache()
+    cache = ResponseCache(reference=reference)
+    cache.put(("a",), {"total": 1})
+    reference.invalidate()
+    assert cache.get(("a",)) is None
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models import Interview
+from backend.core.risk_scoring import RISK_COLUMNS, RiskIndex, sync_risk_index
+from backend.db.flow_records import create_flow_tables
+
+def interview(id):
+    return {'id': id, 'timestamp': datetime(2025, 5, 1), 'name': f'Stakeholder {id}', 'role': 'Recycler',
+            'location': f'City {id % 2}', **{column: 1 + id % 8 for column in RISK_COLUMNS}}
+
+def test_interview_committed_below_the_synced_ids_is_scored(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flows.db'}")
+    create_flow_tables(engine)
+    index = RiskIndex()
+    with sessionmaker(bind=engine)() as session:
+        session.execute(insert(Interview), [interview(id) for id in (1, 2, 4, 5)])
+        session.commit()
+        assert sync_risk_index(session, index) == 4
+        # Id 3 was handed out before 4 and 5 but committed after the sync
+        session.execute(insert(Interview), [interview(3)])
+        session.commit()
+        assert sync_risk_index(session, index) == 1
+        assert sync_risk_index(session, index) == 0
+    assert sorted(index.rows) == [1, 2, 3, 4, 5]
+    assert sorted(index.top(10)['id']) == [1, 2, 3, 4, 5]
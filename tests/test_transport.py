@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.batch import ReferenceTables
+from backend.core.calculator import EmissionsCalculator
+from backend.core.transport import (TRANSPORT_MODES, encode_flows, flow_scenarios, transport_emissions,
+                                    transport_modes)
+
+FLOWS = pd.DataFrame({
+    'material_type': ['PEEK', 'PEEK', 'PPS', 'Unobtainium'],
+    'source_location': ['Utrecht, NL', 'Amsterdam', 'Nowhere', 'Utrecht'],
+    'destination': ['Rotterdam', 'Hamburg', 'Rotterdam', 'Rotterdam'],
+    'transport_mode': ['Truck', 'rail', 'truck', 'truck'],
+    'volume_kg_month': [2000.0, 1000.0, 500.0, 100.0]
+})
+
+def test_cleared_or_invalid_factors_keep_the_defaults():
+    modes, reset = transport_modes({'truck': (None, 1.2), 'rail': (0.03, 0.5), 'barge': ('0.04', '1.5')})
+    assert reset == ['truck', 'rail']
+    assert modes['truck'] == TRANSPORT_MODES['truck'] and modes['rail'] == TRANSPORT_MODES['rail']
+    assert modes['barge'].kg_co2e_per_tonne_km == 0.04
+    # Usable for a recalculation
+    transport_emissions(encode_flows(FLOWS), modes)
+
+def test_flow_transport_feeds_calculator_totals(reference_db):
+    emissions = transport_emissions(encode_flows(FLOWS))
+    with reference_db() as session:
+        tables = ReferenceTables.from_session(session)
+        scenarios, unmatched = flow_scenarios(FLOWS, emissions, tables.material_names,
+                                              'Injection Molding for PP', 'NL grid mix')
+        results = EmissionsCalculator(session, cache=None).compare_scenarios(scenarios)
+    assert unmatched == ['Unobtainium']
+    by_material = {scenario.material_name: (scenario, result) for scenario, result in zip(scenarios, results)}
+    peek, peek_result = by_material['Polyether Ether Ketone (PEEK)']
+    assert peek.mass_kg == 3000.0
+    assert peek_result['breakdown']['transport_emissions'] == pytest.approx(np.nansum(emissions[:2]))
+    # The PPS flow's origin is unknown, so it counts without transport
+    pps, pps_result = by_material['Polyphenylene Sulfide (PPS)']
+    assert pps_result['breakdown']['transport_emissions'] == 0.0
+    assert peek_result['total_emissions_kg_co2e'] == pytest.approx(
+        peek_result['breakdown']['material_production_emissions'] + peek_result['breakdown']['process_emissions']
+        + peek_result['breakdown']['transport_emissions'])
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from analysis.scenarios.recycling import default_scenarios
+from analysis.scenarios.uncertainty import Relative, evaluate_scenario, run_monte_carlo
+
+class Fixed:
+    """Absolute 'distribution' returning the given values in order."""
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+
+    def rvs(self, size, random_state=None):
+        return self.values[:size]
+
+def test_no_samples_is_rejected():
+    with pytest.raises(ValueError):
+        run_monte_carlo(default_scenarios()[:1], {'scrap_percentage': Relative('normal', 0.1)}, n_samples=0)
+
+def test_scrap_percentage_draws_are_clipped():
+    scenario = default_scenarios()[0]
+    result = run_monte_carlo([scenario], {'scrap_percentage': Fixed([-20.0, 50.0, 130.0])}, n_samples=3,
+                             max_workers=1, keep_samples=True)[0]
+    expected = evaluate_scenario(scenario, {'scrap_percentage': np.array([0.0, 50.0, 100.0])})
+    np.testing.assert_allclose(result.samples['total_emissions'], expected['total_emissions'], rtol=1e-6)
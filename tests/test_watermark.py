@@ -0,0 +1,32 @@
+import numpy as np
+
+from backend.core import watermark
+from backend.core.watermark import IdWatermark
+
+def test_skipped_ids_stay_unseen_until_synced():
+    mark = IdWatermark()
+    mark.advance([1, 2, 5, 9], now=0)
+    assert mark.last_id == 9
+    assert mark.gaps == [(3, 4, 0), (6, 8, 0)]
+    np.testing.assert_array_equal(mark.unseen([2, 3, 5, 7, 10]), [False, True, False, True, True])
+
+    mark.advance([3, 7, 10], now=1)
+    assert mark.last_id == 10
+    assert mark.gaps == [(4, 4, 0), (6, 6, 0), (8, 8, 0)]
+
+def test_gaps_expire(monkeypatch):
+    monkeypatch.setattr(watermark, 'SYNC_GAP_TIMEOUT_SECONDS', 60)
+    mark = IdWatermark()
+    mark.advance([1, 3], now=0)
+    mark.advance([], now=30)
+    assert mark.gaps == [(2, 2, 0)]
+    # A rolled back transaction never commits its id
+    mark.advance([], now=61)
+    assert mark.gaps == []
+
+def test_state_round_trip():
+    mark = IdWatermark()
+    mark.advance([1, 4], now=5.0)
+    assert IdWatermark.from_state(mark.to_state()).gaps == mark.gaps
+    # State files written before gaps were tracked hold just the last id
+    assert IdWatermark.from_state(7).last_id == 7